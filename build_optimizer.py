@@ -0,0 +1,336 @@
+import math
+import time
+from typing import Dict, List, Optional
+
+from combat_system import DPSCalculator
+
+# Gear + passives + paragon build search. Maximizes DPSCalculator output subject to
+# a minimum life total, with branch-and-bound over item slots and passive nodes.
+
+# Build stat vector; every source (item, passive, paragon point) adds to these fields
+BUILD_FIELDS = ('attack', 'attack_speed', 'crit_chance', 'crit_mult', 'flat_bonus', 'percent_bonus', 'life')
+_FIELD_INDEX = {name: i for i, name in enumerate(BUILD_FIELDS)}
+_ZERO = (0.0,) * len(BUILD_FIELDS)
+
+# Item/passive stat name (lower case) -> (build field, value per point)
+STAT_SOURCES = {
+    'attack': ('attack', 1), 'power': ('flat_bonus', 1), 'damage': ('flat_bonus', 1),
+    'strength': ('percent_bonus', 0.01), 'intelligence': ('percent_bonus', 0.01),
+    'dexterity': ('crit_chance', 0.002), 'crit chance': ('crit_chance', 0.01),
+    'crit damage': ('crit_mult', 0.01), 'attack speed': ('attack_speed', 0.01),
+    'life': ('life', 1), 'max life': ('life', 1), 'max health': ('life', 1), 'hp': ('life', 1),
+    'vitality': ('life', 5), 'armor': ('life', 1),
+}
+
+# What one paragon point buys, per ParagonSystem bonus stat
+PARAGON_VALUES = {
+    'attack': ('attack', 1), 'crit_chance': ('crit_chance', 0.005), 'crit_mult': ('crit_mult', 0.02),
+    'attack_speed': ('attack_speed', 0.01), 'percent_bonus': ('percent_bonus', 0.01), 'life': ('life', 10),
+}
+
+
+def stat_vector(stats: Dict[str, float]) -> tuple:
+    # Map a stats dict (item or passive) onto BUILD_FIELDS; unknown stats are ignored
+    vec = [0.0] * len(BUILD_FIELDS)
+    for name, value in stats.items():
+        key = name.lower().replace('_', ' ')
+        if name in _FIELD_INDEX:
+            vec[_FIELD_INDEX[name]] += value
+        elif key in STAT_SOURCES:
+            field, scale = STAT_SOURCES[key]
+            vec[_FIELD_INDEX[field]] += value * scale
+    return tuple(vec)
+
+
+def _add(a: tuple, b: tuple) -> tuple:
+    return tuple(x + y for x, y in zip(a, b))
+
+
+def _unit(field: str, value: float) -> tuple:
+    return tuple(value if f == field else 0.0 for f in BUILD_FIELDS)
+
+
+def _dps(vec: tuple) -> float:
+    attack, speed, crit, mult, flat, percent, _ = vec
+    return DPSCalculator.calculate(attack, speed, min(crit, 1.0), mult, flat, percent)
+
+
+def _factors(vec: tuple) -> tuple:
+    # DPS = damage * (1 + percent) * speed * crit
+    return vec[0] + vec[4], 1 + vec[5], vec[1], 1 + min(vec[2], 1.0) * (vec[3] - 1)
+
+
+def _pareto(options: List[tuple]) -> List[tuple]:
+    # Drop (vector, payload) options that another option matches or beats in every field
+    kept = []
+    for vec, payload in sorted(options, key=lambda o: o[0], reverse=True):
+        if not any(all(k >= v for k, v in zip(other, vec)) for other, _ in kept):
+            kept.append((vec, payload))
+    return kept
+
+
+def _passive_sets(locked: List[tuple], budget: int) -> List[tuple]:
+    # (vector, nodes) for every non-dominated subset of locked nodes costing <= budget
+    sets = [(_ZERO, (), 0)]
+    for vec, node in locked:
+        grown = [(_add(v, vec), nodes + (node,), cost + node.required_points)
+                 for v, nodes, cost in sets if cost + node.required_points <= budget]
+        # Cost only matters while growing, so a set is dropped only when another is no worse
+        # in every field and no more expensive
+        merged = sorted(sets + grown, key=lambda s: (s[2], [-v for v in s[0]]))
+        sets = []
+        for v, nodes, cost in merged:
+            if not any(all(k >= x for k, x in zip(other, v)) for other, _, _ in sets):
+                sets.append((v, nodes, cost))
+    return _pareto([(v, nodes) for v, nodes, _ in sets])
+
+
+class BuildOptimizer:
+    """
+    Best-DPS choice of items, passives and paragon points with life >= min_life.
+    """
+    # Items and passives: depth-first branch-and-bound; paragon points are placed exactly at each
+    # leaf. Passive nodes without a `stats` dict are skipped.
+    def __init__(self, base_stats: Dict[str, float], items=(), passives=None, paragon=None,
+                 paragon_points: Optional[int] = None, min_life: float = 0):
+        self.base = tuple(float(base_stats.get(f, 0)) for f in BUILD_FIELDS)
+        self.min_life = min_life
+        slots: Dict[str, List[tuple]] = {}
+        for item in items:
+            slots.setdefault(item.item_type, []).append((stat_vector(item.stats), item))
+        # Every slot may also stay empty; dominated items can never be part of a best build
+        self.slots = [_pareto(options + [(_ZERO, None)]) for _, options in sorted(slots.items())]
+        # Widest slots first: their choice moves the bound most
+        self.slots.sort(key=len, reverse=True)
+        # Passive nodes become one more slot whose options are the non-dominated sets of
+        # locked nodes affordable with the tree's unspent points
+        self.passive_points = passives.points if passives is not None else 0
+        locked = []
+        for node in (passives.nodes if passives is not None else []):
+            vec = stat_vector(getattr(node, 'stats', None) or {})
+            if node.unlocked:
+                self.base = _add(self.base, vec)
+            elif any(v > 0 for v in vec) and node.required_points <= self.passive_points:
+                locked.append((vec, node))
+        self.passive_sets = _passive_sets(locked, self.passive_points)
+        if paragon is not None:
+            for stat, count in paragon.bonuses.items():
+                if stat in PARAGON_VALUES:
+                    self.base = _add(self.base, _unit(PARAGON_VALUES[stat][0], PARAGON_VALUES[stat][1] * count))
+        if paragon_points is None:
+            paragon_points = (paragon.max_points - paragon.points) if paragon is not None else 0
+        self.paragon_points = paragon_points
+        self.nodes_explored = 0
+
+    def _allocate_paragon(self, vec: tuple, points: int):
+        """Greedy paragon placement once crit multiplier points are fixed: (vector, {stat: points}) or None."""
+        # With the multiplier fixed every other stat is a separate concave factor of DPS
+        alloc = {}
+        life_field, life_value = PARAGON_VALUES['life']
+        missing = self.min_life - vec[_FIELD_INDEX[life_field]]
+        if missing > 0:
+            need = math.ceil(missing / life_value)
+            if need > points:
+                return None
+            alloc['life'] = need
+            vec = _add(vec, _unit(life_field, life_value * need))
+            points -= need
+        vec = list(vec)
+        steps = [(stat, _FIELD_INDEX[field], value) for stat, (field, value) in PARAGON_VALUES.items()
+                 if field not in ('life', 'crit_mult')]
+        for _ in range(points if steps else 0):
+            best_dps, best_step = -math.inf, None
+            for step in steps:
+                i = step[1]
+                held = vec[i]
+                vec[i] = held + step[2]
+                dps = _dps(vec)
+                vec[i] = held
+                if dps > best_dps:
+                    best_dps, best_step = dps, step
+            stat, i, value = best_step
+            vec[i] += value
+            alloc[stat] = alloc.get(stat, 0) + 1
+        return tuple(vec), alloc
+
+    def optimize(self) -> Optional[dict]:
+        """Branch-and-bound over items, passives and paragon points; returns the best build found."""
+        # Bound: log x <= log T - 1 + x / T with T from the best build so far makes log-DPS linear in
+        # the remaining choices. Crit multiplier points are branched on first, which leaves crit linear:
+        # (c + dc)(m + dm) <= c*m + c*dm + dc*m_max. Partial builds seen at the same depth are skipped.
+        slots = self.slots + [self.passive_sets]
+        depth_end = len(slots)
+        crit_i, mult_i, life_i = _FIELD_INDEX['crit_chance'], _FIELD_INDEX['crit_mult'], _FIELD_INDEX['life']
+        life_value = PARAGON_VALUES['life'][1]
+        mult_values = [(value, stat) for stat, (field, value) in PARAGON_VALUES.items() if field == 'crit_mult']
+        mult_step, mult_stat = max(mult_values) if mult_values else (0.0, None)
+
+        # Field-wise best of every slot still to decide from each depth on (life and crit bounds)
+        suffix = [_ZERO] * (depth_end + 1)
+        for i in range(depth_end - 1, -1, -1):
+            suffix[i] = _add(suffix[i + 1], tuple(max(col) for col in zip(*(vec for vec, _ in slots[i]))))
+
+        def gains(vec):
+            # Optimistic increases: (damage, percent, speed), crit chance, crit multiplier
+            return (max(vec[0] + vec[4], 0.0), max(vec[5], 0.0), max(vec[1], 0.0)), max(vec[crit_i], 0.0), max(vec[mult_i], 0.0)
+
+        # Best-looking options first, so the first leaf is already a strong incumbent
+        options = [sorted(((vec, payload) + gains(vec) for vec, payload in slot),
+                          key=lambda r: _dps(_add(self.base, r[0])), reverse=True) for slot in slots]
+        paragon_rows = [gains(_unit(field, value)) for stat, (field, value) in PARAGON_VALUES.items()
+                        if field not in ('life', 'crit_mult')]
+        tangent = {}
+
+        def set_tangent(vec):
+            # Per-option linear weights under the new T; crit terms are added per node
+            tangent.clear()
+            factors = _factors(vec)
+            if min(factors) <= 0:
+                return
+            inv = tuple(1 / f for f in factors)
+
+            def weigh(row):
+                lin, dc, dm = row[-3:]
+                return lin[0] * inv[0] + lin[1] * inv[1] + lin[2] * inv[2], dc, dm
+            tangent.update(inv=inv, const=sum(math.log(f) - 1 for f in factors),
+                           slots=[[weigh(r) for r in rows] for rows in options],
+                           paragon=[weigh(r) for r in paragon_rows])
+
+        def bound(depth, vec, points):
+            # (log upper bound, per-option scores at this depth), or None if min_life is out of reach
+            missing = self.min_life - (vec[life_i] + suffix[depth][life_i])
+            # Paragon points that must go to life can't add damage
+            points -= math.ceil(missing / life_value) if missing > 0 else 0
+            if points < 0:
+                return None
+            if not tangent:
+                return math.inf, None
+            inv = tangent['inv']
+            a = (vec[mult_i] - 1 + suffix[depth][mult_i]) * inv[3]
+            b = min(vec[crit_i], 1.0) * inv[3]
+            total = tangent['const'] + sum(f * i for f, i in zip(_factors(vec), inv))
+            scores = None
+            for rows in tangent['slots'][depth:]:
+                row_scores = [w + a * dc + b * dm for w, dc, dm in rows]
+                scores = scores or row_scores
+                total += max(row_scores)
+            if points > 0 and tangent['paragon']:
+                total += points * max(w + a * dc for w, dc, _ in tangent['paragon'])
+            return total, scores
+
+        best = {'dps': -1.0, 'log': -math.inf}
+        branch = {'dps': -1.0}
+        seen = set()
+        self.nodes_explored = 0
+
+        def leaf(vec, points, mult_points, chosen):
+            placed = self._allocate_paragon(vec, points)
+            if placed is None:
+                return
+            dps = _dps(placed[0])
+            if dps > best['dps']:
+                alloc = dict(placed[1], **({mult_stat: mult_points} if mult_points else {}))
+                best.update(dps=dps, log=math.log(dps) if dps > 0 else -math.inf,
+                            vector=placed[0], chosen=list(chosen), paragon=alloc)
+            if dps > branch['dps']:
+                # The branch's own best leaf is the closest tangent point for its bound
+                branch.update(dps=dps, vector=placed[0])
+                set_tangent(placed[0])
+
+        def search(depth, vec, points, mult_points, chosen):
+            key = (depth, tuple(round(v, 9) for v in vec), points)
+            if key in seen:
+                return
+            seen.add(key)
+            self.nodes_explored += 1
+            upper = bound(depth, vec, points)
+            if upper is None or upper[0] <= best['log']:
+                return
+            if depth == depth_end:
+                leaf(vec, points, mult_points, chosen)
+                return
+            scores = upper[1]
+            if scores is None:
+                ranked, rest = [(0.0, row) for row in options[depth]], math.inf
+            else:
+                # A child's bound is at most the parent's with this slot's best score
+                # swapped for its own, so weaker children are cut without a call
+                ranked = sorted(zip(scores, options[depth]), key=lambda sr: sr[0], reverse=True)
+                rest = upper[0] - max(scores)
+            for score, row in ranked:
+                if rest + score <= best['log']:
+                    break
+                chosen.append(row)
+                search(depth + 1, _add(vec, row[0]), points, mult_points, chosen)
+                chosen.pop()
+
+        def build(rows, k):
+            # Same additions, in the same order, as search() makes along that path
+            vec = _add(self.base, _unit('crit_mult', mult_step * k))
+            for row in rows:
+                vec = _add(vec, row[0])
+            return vec
+
+        # One branch per number of paragon points spent on crit multiplier, seeded with the
+        # best-looking build; the most promising splits are searched first. Each branch also
+        # re-scores the best build so far under its own split, which gives it a near-optimal
+        # tangent point
+        seed = [rows[0] for rows in options]
+        branches = []
+        for k in (range(self.paragon_points + 1) if mult_stat is not None else [0]):
+            branch = {'dps': -1.0}
+            tangent.clear()
+            leaf(build(seed, k), self.paragon_points - k, k, seed)
+            branches.append((branch['dps'], k))
+        for _, k in sorted(branches, reverse=True):
+            branch = {'dps': -1.0}
+            tangent.clear()
+            for rows in (seed, best.get('chosen', seed)):
+                leaf(build(rows, k), self.paragon_points - k, k, rows)
+            search(0, build([], k), self.paragon_points - k, k, [])
+        if best['dps'] < 0:
+            return None
+        chosen = best['chosen']
+        return {
+            'dps': best['dps'],
+            'life': best['vector'][life_i],
+            'stats': dict(zip(BUILD_FIELDS, best['vector'])),
+            'items': [row[1] for row in chosen[:-1] if row[1] is not None],
+            'passives': list(chosen[-1][1]),
+            'paragon': best['paragon'],
+            'nodes_explored': self.nodes_explored,
+        }
+
+
+def optimize_build(base_stats: Dict[str, float], items=(), passives=None, paragon=None,
+                   paragon_points: Optional[int] = None, min_life: float = 0) -> Optional[dict]:
+    return BuildOptimizer(base_stats, items, passives, paragon, paragon_points, min_life).optimize()
+
+
+# Example usage / benchmark
+if __name__ == "__main__":
+    import random
+    import item_model
+    from main_menu import ParagonSystem, PassiveNode, PassivesTree
+    rng = random.Random(4)
+    slots = ['Weapon', 'Armor', 'Helmet', 'Gloves', 'Boots', 'Ring', 'Amulet']
+    stat_pool = ['Power', 'Strength', 'Dexterity', 'Attack Speed', 'Vitality', 'Armor']
+    items = []
+    for i in range(350):
+        stats = {s: rng.randint(1, 40) for s in rng.sample(stat_pool, 3)}
+        items.append(item_model.Item(f"Item {i}", rng.choice(slots), 'Rare', stats))
+    tree = PassivesTree()
+    tree.points = 10
+    for i in range(14):
+        stat = rng.choice(stat_pool)
+        tree.add_node(PassiveNode(f"Node {i}", f"+{stat}", rng.randint(1, 3), stats={stat: rng.randint(5, 30)}))
+    for points in (30, 200):
+        paragon = ParagonSystem()
+        paragon.max_points = points
+        start = time.perf_counter()
+        result = optimize_build({'attack': 20, 'attack_speed': 1.0, 'crit_chance': 0.05, 'crit_mult': 1.5, 'life': 100},
+                                items, tree, paragon, min_life=400)
+        print(f"{len(items)} items, {len(tree.nodes)} passives, {points} paragon points: best DPS {result['dps']:.1f} "
+              f"(life {result['life']:.0f}) in {time.perf_counter() - start:.2f}s, {result['nodes_explored']} nodes")
+        print(f"  items: {[i.name for i in result['items']]}")
+        print(f"  passives: {[n.name for n in result['passives']]}, paragon: {result['paragon']}")
@@ -1,22 +1,11 @@
 import tkinter as tk
 from tkinter import messagebox
 from typing import List, Dict, Optional, TYPE_CHECKING
-import importlib.util
-import sys
-import random
-
-# Dynamically import Item for runtime and type hints
-item_mod_name = 'from typing import List, Dict, Optional'
-item_mod_path = 'from typing import List, Dict, Optional.py'
-spec = importlib.util.spec_from_file_location(item_mod_name, item_mod_path)
-if spec and spec.loader:
-    item_mod = importlib.util.module_from_spec(spec)
-    sys.modules[item_mod_name] = item_mod
-    spec.loader.exec_module(item_mod)
-    Item = item_mod.Item
-else:
-    class Item:
-        pass
+import rng_system
+from loot_system import LootEngine
+
+# Item model (loaded once by item_model)
+from item_model import Item
 
 # Character class for the system
 class Character:
@@ -79,29 +68,24 @@ class Equipment:
         return {'Weapon': self.weapon, 'Armor': self.armor}
 
 class LootSystem:
+    # Not LOOT_RARITIES: gear drops keep Mythic, all four equally likely
     RARITIES = ['Common', 'Rare', 'Legendary', 'Mythic']
     GEAR_CLASSES = Character.D4_CLASSES + Character.WOW_CLASSES
+    _engine = None
 
     @staticmethod
-    def generate_loot(char_class):
-        import random
-        item_mod = sys.modules.get('from typing import List, Dict, Optional')
-        if not item_mod:
-            import importlib.util
-            spec = importlib.util.spec_from_file_location('from typing import List, Dict, Optional', 'from typing import List, Dict, Optional.py')
-            if spec and spec.loader:
-                item_mod = importlib.util.module_from_spec(spec)
-                sys.modules['from typing import List, Dict, Optional'] = item_mod
-                spec.loader.exec_module(item_mod)
-        Item = getattr(item_mod, 'Item', None)
-        item_type = random.choice(['Weapon', 'Armor'])
-        rarity = random.choice(LootSystem.RARITIES)
-        name = f"{rarity} {item_type} of {char_class}"
-        stats = {"Power": random.randint(10, 100)}
-        if Item:
-            return Item(name, item_type, rarity, stats)
-        else:
-            return None
+    def engine():
+        if LootSystem._engine is None:
+            LootSystem._engine = LootEngine(rarities=[{'name': r, 'weight': 1} for r in LootSystem.RARITIES])
+        return LootSystem._engine
+
+    @staticmethod
+    def generate_loot(char_class, rng=None):
+        return LootSystem.engine().roll(char_class, rng)
+
+    @staticmethod
+    def generate_batch(n, char_class, rng=None):
+        return LootSystem.engine().generate_batch(n, char_class, rng)
 
 class CharacterSystem:
     def __init__(self):
@@ -342,10 +326,11 @@ class Nemesis:
     ABILITIES = [
         "Poison Weapon", "Fire Aura", "Regeneration", "Teleport", "Summon Minions", "Fearless", "Enrage", "Berserk", "Stealth", "Explosive Death"
     ]
-    def __init__(self, name: str, rank: Optional[str] = None, abilities: Optional[list] = None, level: int = 1):
+    def __init__(self, name: str, rank: Optional[str] = None, abilities: Optional[list] = None, level: int = 1, rng=None):
+        rng = rng or rng_system.stream('nemesis')
         self.name = name
-        self.rank = rank if rank is not None else random.choice(Nemesis.RANKS)
-        self.abilities = abilities if abilities is not None else random.sample(Nemesis.ABILITIES, k=random.randint(1, 3))
+        self.rank = rank if rank is not None else rng.choice(Nemesis.RANKS)
+        self.abilities = abilities if abilities is not None else rng.sample(Nemesis.ABILITIES, k=rng.randint(1, 3))
         self.level = level
         self.is_alive = True
     def promote(self):
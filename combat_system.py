@@ -0,0 +1,633 @@
+import heapq
+import os
+import time
+from typing import List
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import rng_system
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Headless combat math, shared by the GUI (main_menu), simulations and build tools.
+
+
+class DPSCalculator:
+    @staticmethod
+    def calculate(base_damage: int, attack_speed: float, crit_chance: float, crit_mult: float, flat_bonus: int = 0, percent_bonus: float = 0.0):
+        crit = 1 + (crit_chance * (crit_mult - 1))
+        dps = ((base_damage + flat_bonus) * (1 + percent_bonus)) * attack_speed * crit
+        return dps
+
+    @staticmethod
+    def calculate_batch(base_damage, attack_speed, crit_chance, crit_mult, flat_bonus=0, percent_bonus=0.0):
+        """calculate() over columns: scalars broadcast; NumPy when installed; always a list of floats."""
+        # Same operation order as calculate(), so results match the scalar path bit for bit
+        args = (base_damage, attack_speed, crit_chance, crit_mult, flat_bonus, percent_bonus)
+        if numpy is not None:
+            b, s, c, m, f, p = (numpy.asarray(a) for a in args)
+            crit = 1 + (c * (m - 1))
+            return numpy.atleast_1d(((b + f) * (1 + p)) * s * crit).astype(float).tolist()
+        columns = [a if isinstance(a, (list, tuple)) else list(a) if hasattr(a, '__iter__') else None for a in args]
+        lengths = {len(col) for col in columns if col is not None}
+        lengths.discard(1)
+        if len(lengths) > 1:
+            raise ValueError(f"calculate_batch: cannot broadcast lengths {sorted(lengths)}")
+        n = lengths.pop() if lengths else max((len(col) for col in columns if col is not None), default=1)
+        b, s, c, m, f, p = (
+            [arg] * n if col is None else col * n if len(col) == 1 else col
+            for arg, col in zip(args, columns)
+        )
+        calculate = DPSCalculator.calculate
+        return [calculate(*row) for row in zip(b, s, c, m, f, p)]
+
+
+class CombatLog:
+    """
+    Fixed-capacity ring buffer of (tick, actor, action, amount); text is built on display.
+    """
+    __slots__ = ('capacity', 'enabled', '_entries', '_next', '_count')
+
+    # Lines for the fixed actions; any other action is a skill name
+    FORMATS = {
+        ('player', 'attack'): "Player attacks for {amount} damage!",
+        ('enemy', 'attack'): "Enemy attacks for {amount} damage!",
+        ('enemy', 'defeated'): "Enemy defeated!",
+        ('player', 'defeated'): "You have been defeated!",
+        ('player', 'no_mana'): "Not enough mana!",
+    }
+
+    def __init__(self, capacity: int = 64, enabled: bool = True):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._entries = [None] * capacity
+        self._next = 0
+        self._count = 0
+
+    def record(self, tick: int, actor, action: str, amount=0):
+        if self.enabled:
+            self._entries[self._next] = (tick, actor, action, amount)
+            self._next = (self._next + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+
+    def append(self, text: str, tick: int = 0):
+        # Free-form line (kept for callers that log plain messages)
+        self.record(tick, None, 'text', text)
+
+    def clear(self):
+        self._entries = [None] * self.capacity
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def tail(self, n: int) -> list:
+        # Last n entries, oldest first
+        n = min(n, self._count)
+        start = self._next - n
+        return [self._entries[i % self.capacity] for i in range(start, self._next)]
+
+    def __iter__(self):
+        return iter(self.tail(self._count))
+
+    @classmethod
+    def format(cls, entry) -> str:
+        tick, actor, action, amount = entry
+        if action == 'text':
+            return amount
+        template = cls.FORMATS.get((actor, action))
+        if template is not None:
+            return template.format(amount=amount)
+        if action == 'pulse':
+            return f"{actor} deals {amount} damage!"
+        if action == 'gains':
+            return f"{str(actor).capitalize()} gains {amount}."
+        if action == 'fades':
+            return f"{amount} fades from {actor}."
+        return f"{str(actor).capitalize()} uses {action} for {amount} damage!"
+
+    def lines(self, n: int) -> List[str]:
+        return [self.format(entry) for entry in self.tail(n)]
+
+
+class StatusEffect:
+    """A buff, debuff or damage-over-time on one target; times are engine ticks."""
+    __slots__ = ('name', 'kind', 'target', 'stat', 'amount', 'period', 'expires_at', 'active', 'next_pulse', 'pulsing')
+
+    def __init__(self, name, kind, target, stat, amount, period, expires_at):
+        self.name = name
+        self.kind = kind          # 'buff', 'debuff' or 'dot'
+        self.target = target
+        self.stat = stat          # CombatStats field it modifies (additive), or None
+        self.amount = amount      # stat change, or damage per pulse for a dot
+        self.period = period      # ticks between dot pulses (0 = no pulses)
+        self.expires_at = expires_at
+        self.active = True
+        self.next_pulse = None    # tick of the next pulse in the chain
+        self.pulsing = False      # a pulse entry is queued on the heap
+
+    def __repr__(self):
+        return f"{self.name} ({self.kind}) until {self.expires_at}"
+
+
+class StatusEffects:
+    """
+    Effects for any number of targets, driven by one timer heap of (due tick, seq, kind, effect).
+    """
+    # Stale heap entries (removed or refreshed effects) are skipped when popped; removed effects
+    # stay in their target's list until it is next read or half dead.
+    def __init__(self):
+        self._heap = []
+        self._seq = 0         # tie-breaker so heap entries never compare effects
+        self._active = {}     # target -> list of effects, removed ones included until compacted
+        self._removed = {}    # target -> removed effects still in its list
+        self._mods = {}       # target -> {stat: summed modifier}
+
+    def __getitem__(self, target) -> list:
+        if self._removed.get(target):
+            self._compact(target)
+        return self._active.get(target, [])
+
+    def _compact(self, target):
+        self._active[target] = [effect for effect in self._active[target] if effect.active]
+        self._removed[target] = 0
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def __len__(self):
+        return sum(len(effects) for effects in self._active.values()) - sum(self._removed.values())
+
+    def modifiers(self, target) -> dict:
+        return self._mods.get(target, {})
+
+    def apply(self, target, name: str, duration: int, now: int, kind: str = 'buff', stat: str = None,
+              amount=0, period: int = 0) -> StatusEffect:
+        effect = StatusEffect(name, kind, target, stat, amount, period, now + duration)
+        self._active.setdefault(target, []).append(effect)
+        if stat is not None:
+            mods = self._mods.setdefault(target, {})
+            mods[stat] = mods.get(stat, 0) + amount
+        heapq.heappush(self._heap, (effect.expires_at, self._next_seq(), 'expire', effect))
+        if period > 0:
+            effect.next_pulse = now + period
+            self._queue_pulse(effect)
+        return effect
+
+    def _queue_pulse(self, effect: StatusEffect):
+        # Push the chain's next pulse if it lands before expiry; otherwise the chain stops
+        effect.pulsing = effect.next_pulse <= effect.expires_at
+        if effect.pulsing:
+            heapq.heappush(self._heap, (effect.next_pulse, self._next_seq(), 'pulse', effect))
+
+    def refresh(self, effect: StatusEffect, duration: int, now: int):
+        # New expiry; the old heap entry goes stale. A pulse chain that stopped short of
+        # the old expiry picks up again on its own cadence
+        effect.expires_at = now + duration
+        heapq.heappush(self._heap, (effect.expires_at, self._next_seq(), 'expire', effect))
+        if effect.period > 0 and not effect.pulsing:
+            self._queue_pulse(effect)
+
+    def remove(self, effect: StatusEffect):
+        if not effect.active:
+            return
+        effect.active = False
+        target = effect.target
+        removed = self._removed[target] = self._removed.get(target, 0) + 1
+        if 2 * removed > len(self._active[target]):
+            self._compact(target)
+        if effect.stat is not None:
+            self._mods[effect.target][effect.stat] -= effect.amount
+
+    def clear(self, target):
+        for effect in list(self[target]):
+            self.remove(effect)
+
+    def advance(self, now: int, callback=None):
+        # Fire everything due by `now`: callback(event, effect) with event 'pulse' or 'expire'
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, _, event, effect = heapq.heappop(heap)
+            if not effect.active:
+                continue
+            if event == 'expire':
+                if due != effect.expires_at:
+                    continue
+                self.remove(effect)
+            else:
+                effect.next_pulse = due + effect.period
+                self._queue_pulse(effect)
+            if callback is not None:
+                callback(event, effect)
+
+
+class CombatStats(namedtuple('CombatStats', 'attack attack_speed crit_chance crit_mult dps hit')):
+    """
+    Immutable offensive stats of one combatant with DPS and per-swing damage precomputed.
+    """
+    # Rebuilt by CombatSystem.refresh_stats when gear or buffs change
+    __slots__ = ()
+
+    @classmethod
+    def build(cls, attack, attack_speed, crit_chance, crit_mult) -> 'CombatStats':
+        return cls(attack, attack_speed, crit_chance, crit_mult,
+                   DPSCalculator.calculate(attack, attack_speed, crit_chance, crit_mult),
+                   DPSCalculator.calculate(attack, 1.0, crit_chance, crit_mult))
+
+    @classmethod
+    def of_player(cls, player: dict, mods: dict = None) -> 'CombatStats':
+        stats = player.get('stats', {})
+        mods = mods or {}
+        return cls.build(stats.get('attack', 10) + mods.get('attack', 0),
+                         stats.get('attack_speed', 1.0) + mods.get('attack_speed', 0),
+                         stats.get('crit_chance', 0.05) + mods.get('crit_chance', 0),
+                         stats.get('crit_mult', 2.0) + mods.get('crit_mult', 0))
+
+    @classmethod
+    def of_enemy(cls, enemy: dict, mods: dict = None) -> 'CombatStats':
+        mods = mods or {}
+        return cls.build(enemy.get('attack', 8) + mods.get('attack', 0),
+                         enemy.get('attack_speed', 1.0) + mods.get('attack_speed', 0),
+                         enemy.get('crit_chance', 0.05) + mods.get('crit_chance', 0),
+                         enemy.get('crit_mult', 1.5) + mods.get('crit_mult', 0))
+
+
+class CombatSystem:
+    def __init__(self, player, enemy, rng=None, log: CombatLog = None, stats: tuple = None):
+        # stats: prebuilt (player, enemy) CombatStats to share across many fights
+        self.player = player
+        self.enemy = enemy
+        self.rng = rng or rng_system.stream('combat')
+        self.turn = 'player'  # or 'enemy'
+        self.tick = 0  # advanced by CombatEngine; stays 0 in turn-by-turn use
+        # A turn stands for a second of fighting and deals DPS; under CombatEngine swings are
+        # already spaced by attack speed, so each one deals per-swing damage instead
+        self.per_swing = False
+        self.log = log if log is not None else CombatLog()
+        self.player_hp = player.get('stats', {}).get('hp', 100)
+        self.enemy_hp = enemy.get('hp', 50)
+        self.player_max_hp = player.get('stats', {}).get('max_hp', 100)
+        self.enemy_max_hp = enemy.get('hp', 50)
+        self.player_mana = player.get('stats', {}).get('mana', 50)
+        self.player_max_mana = player.get('stats', {}).get('max_mana', 50)
+        self.status = StatusEffects()  # status['player'] / status['enemy'] list active effects
+        self.on_status = None  # callable(event, effect, amount) for 'gains' / 'pulse' / 'fades'; set by CombatEngine
+        self.result = None
+        if stats is not None:
+            self.player_stats, self.enemy_stats = stats
+        else:
+            self.refresh_stats()
+
+    def refresh_stats(self):
+        # Call after gear or buffs change
+        self.player_stats = CombatStats.of_player(self.player, self.status.modifiers('player'))
+        self.enemy_stats = CombatStats.of_enemy(self.enemy, self.status.modifiers('enemy'))
+
+    def apply_status(self, target: str, name: str, duration: int, kind: str = 'buff', stat: str = None,
+                     amount=0, period: int = 0) -> StatusEffect:
+        # target is 'player' or 'enemy'; duration and period are in engine ticks
+        effect = self.status.apply(target, name, duration, self.tick, kind, stat, amount, period)
+        if stat is not None:
+            self.refresh_stats()
+        self.log.record(self.tick, target, 'gains', name)
+        if self.on_status is not None:
+            self.on_status('gains', effect, 0)
+        return effect
+
+    def update_status(self):
+        # Fire status effects due at the current tick
+        self.status.advance(self.tick, self._on_status)
+
+    def _on_status(self, event: str, effect: StatusEffect):
+        if event == 'expire':
+            if effect.stat is not None:
+                self.refresh_stats()
+            self.log.record(self.tick, effect.target, 'fades', effect.name)
+            if self.on_status is not None:
+                self.on_status('fades', effect, 0)
+            return
+        if self.result is not None:
+            return
+        dmg = effect.amount
+        self.log.record(self.tick, effect.name, 'pulse', dmg)
+        if effect.target == 'enemy':
+            self.enemy_hp -= dmg
+            if self.enemy_hp <= 0:
+                self.enemy_hp = 0
+                self.result = 'win'
+                self.log.record(self.tick, 'enemy', 'defeated')
+        else:
+            self.player_hp -= dmg
+            if self.player_hp <= 0:
+                self.player_hp = 0
+                self.result = 'lose'
+                self.log.record(self.tick, 'player', 'defeated')
+        if self.on_status is not None:
+            self.on_status('pulse', effect, dmg)
+
+    def player_attack(self):
+        stats = self.player_stats
+        dmg = int((stats.hit if self.per_swing else stats.dps) * self.rng.uniform(0.8, 1.2))
+        self.enemy_hp -= dmg
+        self.log.record(self.tick, 'player', 'attack', dmg)
+        if self.enemy_hp <= 0:
+            self.enemy_hp = 0
+            self.result = 'win'
+            self.log.record(self.tick, 'enemy', 'defeated')
+        self.turn = 'enemy'
+
+    def enemy_attack(self):
+        stats = self.enemy_stats
+        dmg = int((stats.hit if self.per_swing else stats.dps) * self.rng.uniform(0.8, 1.2))
+        self.player_hp -= dmg
+        self.log.record(self.tick, 'enemy', 'attack', dmg)
+        if self.player_hp <= 0:
+            self.player_hp = 0
+            self.result = 'lose'
+            self.log.record(self.tick, 'player', 'defeated')
+        self.turn = 'player'
+
+    def use_skill(self, skill):
+        # Example: skills cost mana, deal extra damage
+        cost = skill.get('mana_cost', 10)
+        if self.player_mana < cost:
+            self.log.record(self.tick, 'player', 'no_mana')
+            return
+        self.player_mana -= cost
+        base = self.player_stats.attack + skill.get('power', 10)
+        dmg = int(base * self.rng.uniform(1.1, 1.5))
+        self.enemy_hp -= dmg
+        self.log.record(self.tick, 'player', skill['name'], dmg)
+        if self.enemy_hp <= 0:
+            self.enemy_hp = 0
+            self.result = 'win'
+            self.log.record(self.tick, 'enemy', 'defeated')
+        self.turn = 'enemy'
+
+    def is_over(self):
+        return self.result is not None
+
+    def get_log(self):
+        return '\n'.join(self.log.lines(6))
+
+
+# === Fixed-timestep combat engine ===
+
+TICK_RATE = 20  # engine ticks per second of game time
+
+# One entry of the engine's event stream; amount is damage dealt (0 if none)
+CombatEvent = namedtuple('CombatEvent', 'tick actor action amount')
+
+
+class CombatEngine:
+    """
+    Drives a CombatSystem on a fixed timestep, independent of any UI clock.
+    """
+    # Each side acts when its attack-speed timer is up (the player only with an action queued or
+    # `auto_player`); subscribers get CombatEvent tuples.
+    def __init__(self, combat: CombatSystem, tick_rate: int = TICK_RATE, auto_player=None):
+        self.combat = combat
+        self.tick_rate = tick_rate
+        self.tick_ms = max(1, int(1000 / tick_rate))
+        self.auto_player = auto_player  # callable(engine) -> ('attack' | 'skill' | 'wait', skill or None)
+        self.current_tick = 0
+        # Intervals are read from the stat snapshots when each action is scheduled,
+        # so attack-speed buffs take effect on the next swing
+        self.player_ready_at = 0
+        self.enemy_ready_at = self._interval(combat.enemy_stats.attack_speed)
+        self._queued = None
+        self._subscribers = []
+        combat.on_status = self._on_status
+        combat.per_swing = True
+
+    def _interval(self, attack_speed: float) -> int:
+        return max(1, round(self.tick_rate / attack_speed)) if attack_speed > 0 else self.tick_rate
+
+    @property
+    def time(self) -> float:
+        return self.current_tick / self.tick_rate
+
+    @property
+    def player_ready(self) -> bool:
+        return self.current_tick >= self.player_ready_at and not self.combat.is_over()
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _emit(self, actor: str, action: str, amount: int = 0):
+        if self._subscribers:
+            event = CombatEvent(self.current_tick, actor, action, amount)
+            for callback in self._subscribers:
+                callback(event)
+
+    def _on_status(self, event: str, effect: StatusEffect, amount: int):
+        # Status changes join the event stream: pulses as (effect name, 'pulse', damage), gains / fades by target
+        self._emit(effect.name if event == 'pulse' else effect.target, event, amount)
+
+    def queue(self, action: str, skill: dict = None):
+        # Player's next action ('attack', 'skill' or 'wait'); runs when the player's timer is up
+        self._queued = (action, skill)
+
+    def tick(self):
+        combat = self.combat
+        if combat.is_over():
+            return
+        self.current_tick += 1
+        now = combat.tick = self.current_tick
+        combat.update_status()
+        if combat.is_over():
+            self._emit('player' if combat.result == 'lose' else 'enemy', 'defeated')
+            return
+        if now >= self.player_ready_at:
+            action = self._queued or (self.auto_player(self) if self.auto_player else None)
+            if action is not None:
+                self._queued = None
+                self._player_act(*action)
+        if not combat.is_over() and now >= self.enemy_ready_at:
+            before = combat.player_hp
+            combat.enemy_attack()
+            self.enemy_ready_at = now + self._interval(combat.enemy_stats.attack_speed)
+            self._emit('enemy', 'attack', before - combat.player_hp)
+            if combat.result == 'lose':
+                self._emit('player', 'defeated')
+        if not combat.is_over() and now == self.player_ready_at:
+            self._emit('player', 'ready')
+
+    def _player_act(self, action: str, skill: dict = None):
+        combat = self.combat
+        before = combat.enemy_hp
+        if action == 'skill' and skill is not None:
+            if combat.player_mana < skill.get('mana_cost', 10):
+                combat.use_skill(skill)  # logs the refusal; the player's timer is not spent
+                self._emit('player', 'no_mana')
+                return
+            combat.use_skill(skill)
+        elif action == 'attack':
+            combat.player_attack()
+        self.player_ready_at = self.current_tick + self._interval(combat.player_stats.attack_speed)
+        self._emit('player', action, before - combat.enemy_hp)
+        if combat.result == 'win':
+            self._emit('enemy', 'defeated')
+
+    def run(self, max_ticks: int = 100000):
+        # Step until the fight ends (or max_ticks pass); returns the result
+        end = self.current_tick + max_ticks
+        while not self.combat.is_over() and self.current_tick < end:
+            self.tick()
+        return self.combat.result
+
+
+# === Monte Carlo combat simulation ===
+
+SIM_CHUNK = 2000      # fights per task; seeds are per chunk, so results don't depend on worker count
+SIM_MAX_TURNS = 1000  # a fight still running after this many player turns counts as a timeout
+
+
+def monster_enemy(monster_id: str) -> dict:
+    # CombatSystem enemy dict for a game_assets.MONSTERS entry
+    import game_assets
+    monster = game_assets.MONSTERS[monster_id]
+    return {'name': monster['name'], 'hp': monster['hp'], 'attack': monster['damage'], 'level': monster.get('level', 1)}
+
+
+def _simulate_chunk(player, enemy, n_fights, seed, chunk, skill):
+    # One worker task: n_fights complete fights from the chunk's own stream
+    rng = rng_system.RNGStreams(seed).spawn('simulate', chunk)
+    wins = timeouts = 0
+    ttk, hits, mana = Counter(), Counter(), Counter()
+    quiet = CombatLog(1, enabled=False)
+    stats = (CombatStats.of_player(player), CombatStats.of_enemy(enemy))
+    for _ in range(n_fights):
+        combat = CombatSystem(player, enemy, rng=rng, log=quiet, stats=stats)
+        start_mana = combat.player_mana
+        turns = 0
+        while combat.result is None and turns < SIM_MAX_TURNS:
+            turns += 1
+            before = combat.enemy_hp
+            if skill is not None and combat.player_mana >= skill.get('mana_cost', 10):
+                combat.use_skill(skill)
+            else:
+                combat.player_attack()
+            hits[before - combat.enemy_hp] += 1
+            if combat.result is None:
+                combat.enemy_attack()
+        if combat.result == 'win':
+            wins += 1
+            ttk[turns] += 1
+        elif combat.result is None:
+            timeouts += 1
+        mana[start_mana - combat.player_mana] += 1
+    return wins, timeouts, ttk, hits, mana
+
+
+def _percentiles(counts: Counter, points=(5, 25, 50, 75, 95, 99)) -> dict:
+    total = sum(counts.values())
+    if not total:
+        return {p: None for p in points}
+    result, seen, values = {}, 0, sorted(counts)
+    targets = iter(sorted(points))
+    point = next(targets)
+    for value in values:
+        seen += counts[value]
+        while point is not None and seen * 100 >= point * total:
+            result[point] = value
+            point = next(targets, None)
+    return result
+
+
+def simulate(player: dict, enemy: dict, n_fights: int = 10000, workers: int = None, seed: int = None,
+             skill: dict = None) -> dict:
+    """Run n_fights CombatSystem fights across a process pool; same seed, same result for any worker count."""
+    # Each SIM_CHUNK of fights has its own stream derived from `seed`; workers=1 runs in-process.
+    # Time-to-kill is in player turns over won fights.
+    seed = rng_system.streams.seed if seed is None else seed
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(SIM_CHUNK, n_fights - start) for start in range(0, n_fights, SIM_CHUNK)]
+    args = [(player, enemy, size, seed, chunk, skill) for chunk, size in enumerate(sizes)]
+    if workers == 1 or len(args) == 1:
+        results = [_simulate_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*args)))
+    wins = timeouts = 0
+    ttk, hits, mana = Counter(), Counter(), Counter()
+    for w, t, chunk_ttk, chunk_hits, chunk_mana in results:
+        wins += w
+        timeouts += t
+        ttk.update(chunk_ttk)
+        hits.update(chunk_hits)
+        mana.update(chunk_mana)
+    return {
+        'fights': n_fights,
+        'wins': wins,
+        'timeouts': timeouts,
+        'win_rate': wins / n_fights if n_fights else 0.0,
+        'ttk': dict(sorted(ttk.items())),
+        'ttk_mean': sum(k * v for k, v in ttk.items()) / wins if wins else None,
+        'ttk_percentiles': _percentiles(ttk),
+        'damage_percentiles': _percentiles(hits),
+        'mana_used_mean': sum(k * v for k, v in mana.items()) / n_fights if n_fights else 0.0,
+        'mana_used_percentiles': _percentiles(mana),
+    }
+
+
+# DPS batch benchmark
+if __name__ == "__main__":
+    import random
+    rows = 1_000_000
+    rng = random.Random(1)
+    base = [rng.randint(5, 500) for _ in range(rows)]
+    speed = [rng.uniform(0.5, 2.5) for _ in range(rows)]
+    crit = [rng.uniform(0.0, 0.6) for _ in range(rows)]
+    mult = [rng.uniform(1.5, 3.5) for _ in range(rows)]
+    flat = [rng.randint(0, 50) for _ in range(rows)]
+    percent = [rng.uniform(0.0, 1.5) for _ in range(rows)]
+    start = time.perf_counter()
+    scalar = [DPSCalculator.calculate(*row) for row in zip(base, speed, crit, mult, flat, percent)]
+    scalar_time = time.perf_counter() - start
+    print(f"Scalar loop: {rows} rows in {scalar_time:.2f}s")
+    if numpy is not None:
+        arrays = [numpy.asarray(col) for col in (base, speed, crit, mult, flat, percent)]
+        start = time.perf_counter()
+        batch = DPSCalculator.calculate_batch(*arrays)
+        batch_time = time.perf_counter() - start
+        print(f"NumPy batch: {rows} rows in {batch_time:.3f}s ({scalar_time / batch_time:.0f}x), "
+              f"identical: {batch == scalar}")
+    else:
+        start = time.perf_counter()
+        batch = DPSCalculator.calculate_batch(base, speed, crit, mult, flat, percent)
+        print(f"Pure-Python batch (NumPy not installed): {rows} rows in {time.perf_counter() - start:.2f}s, "
+              f"identical: {batch == scalar}")
+    player = {'name': 'Bench', 'stats': {'hp': 120, 'max_hp': 120, 'attack': 12, 'mana': 50, 'max_mana': 50}}
+    skill = {'name': 'Bash', 'mana_cost': 10, 'power': 15}
+    for workers in (1, os.cpu_count() or 1):
+        start = time.perf_counter()
+        report = simulate(player, monster_enemy('blood_bishop'), 100_000, workers=workers, seed=7, skill=skill)
+        print(f"simulate: 100000 fights on {workers} worker(s) in {time.perf_counter() - start:.2f}s, "
+              f"win rate {report['win_rate']:.3f}, ttk p50 {report['ttk_percentiles'][50]}")
+    effects = StatusEffects()
+    targets, per_target, ticks = 40, 10, 20_000
+    rng = random.Random(3)
+    for t in range(targets):
+        for k in range(per_target):
+            effects.apply(t, f"Effect {k}", rng.randint(TICK_RATE, 60 * TICK_RATE), 0, kind='dot',
+                          amount=1, period=rng.choice((TICK_RATE, 2 * TICK_RATE)))
+    buffs = [effects.apply(t, "Refresh", 60 * TICK_RATE, 0, stat='attack', amount=1) for t in range(targets)]
+    start = time.perf_counter()
+    for now in range(1, ticks + 1):
+        effects.advance(now)
+        if now % 10 == 0:
+            effects.refresh(buffs[now % targets], 60 * TICK_RATE, now)
+    print(f"status effects: {ticks} ticks, {targets} targets, {len(effects)} active at end, "
+          f"{(time.perf_counter() - start) / ticks * 1e6:.1f}us per tick")
+
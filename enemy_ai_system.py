@@ -0,0 +1,467 @@
+import math
+import time
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from spatial_system import SpatialHash
+
+# Enemy AI in struct-of-arrays form. One EnemyAIBatch holds the positions, states and
+# patrol routes of every enemy in a zone and advances them all in one pass per tick;
+# EnemyAI is a thin per-enemy view over one row, kept for code written against it.
+
+STATES = ['idle', 'patrol', 'chase', 'attack', 'flee']
+IDLE, PATROL, CHASE, ATTACK, FLEE = range(len(STATES))
+AGGRO_RADIUS = 5
+
+
+# Per-row columns: name, NumPy dtype, Python type for the list fallback
+COLUMNS = (
+    ('x', 'float64', float), ('y', 'float64', float), ('state', 'int8', int), ('patrol_index', 'int32', int),
+    ('route_start', 'int64', int), ('route_len', 'int32', int), ('alive', 'bool', bool), ('target', 'int32', int),
+    ('way_x', 'float64', float), ('way_y', 'float64', float), ('leg', 'int32', int),
+)
+
+
+def _grow(col, size: int, dtype: str, kind):
+    # A copy of col (or a new column if None) with room for size rows
+    if numpy is not None:
+        grown = numpy.zeros(size, dtype=dtype)
+        if col is not None:
+            grown[:len(col)] = col
+        return grown
+    col = col or []
+    return col + [kind(0)] * (size - len(col))
+
+
+class EnemyAIBatch:
+    """
+    Column store of enemies (x, y, state, patrol index), advanced all at once, vectorized with NumPy.
+    """
+    # Freed rows are reused by add(). grid buckets live rows by cell so aggro and query() only
+    # look at nearby enemies. Patrollers walk straight to their route point when the line is clear,
+    # else along an A* path planned once per leg (way_x/way_y, leg -1: replan); chasers share the
+    # pathfinder's flow field for their player. Without a pathfinder everyone walks straight.
+    def __init__(self, capacity: int = 64, aggro_radius: float = AGGRO_RADIUS, cell_size: Optional[float] = None,
+                 pathfinder=None, speed: float = 1.0):
+        self.aggro_radius = aggro_radius
+        self.grid = SpatialHash(cell_size or aggro_radius)
+        self.pathfinder = pathfinder
+        self.speed = speed
+        self.players: List[Tuple[float, float]] = []
+        self.enemies: List[object] = []
+        self._size = 0  # rows in use, live or free
+        self._free: List[int] = []
+        self._live = 0
+        self._capacity = 0
+        for name, _, _ in COLUMNS:
+            setattr(self, name, None)
+        self._reserve(max(1, capacity))
+        # Patrol points of every row, back to back; rows point at their slice
+        self._route_x, self._route_y = [], []
+        self._route_garbage = 0
+        # Waypoints of each patrolling row's current leg, and per row the planned legs
+        # that start on a route point (route index -> path), reused on every lap
+        self._legs = {}
+        self._route_legs = {}
+        self._legs_version = pathfinder.grid.version if pathfinder is not None else 0
+
+    def _reserve(self, capacity: int):
+        if capacity > self._capacity:
+            for name, dtype, kind in COLUMNS:
+                setattr(self, name, _grow(getattr(self, name), capacity, dtype, kind))
+            self._capacity = capacity
+
+    def __len__(self):
+        return self._live
+
+    def add(self, enemy, patrol_points: Optional[Sequence[Tuple[float, float]]] = None, position=None) -> int:
+        # Returns the enemy's row; it keeps that row until removed
+        if self._free:
+            row = self._free.pop()
+            self.enemies[row] = enemy
+        else:
+            row = self._size
+            self._size += 1
+            if self._size > self._capacity:
+                self._reserve(self._capacity * 2)
+            self.enemies.append(enemy)
+        x, y = position if position is not None else getattr(enemy, 'position', (0, 0))
+        self.x[row], self.y[row] = x, y
+        self.grid.insert(row, x, y)
+        self.state[row] = IDLE
+        self.target[row] = -1
+        self.patrol_index[row] = 0
+        self._set_route(row, patrol_points or [])
+        self.alive[row] = True
+        self._live += 1
+        return row
+
+    def remove(self, row: int):
+        if not self.alive[row]:
+            return
+        self.alive[row] = False
+        self.enemies[row] = None
+        self.grid.remove(row)
+        self._legs.pop(row, None)
+        self._route_legs.pop(row, None)
+        self._route_garbage += int(self.route_len[row])
+        self.route_len[row] = 0
+        self._free.append(row)
+        self._live -= 1
+        if self._route_garbage > len(self._route_x) // 2:
+            self._compact_routes()
+
+    def rows(self) -> List[int]:
+        return [row for row in range(self._size) if self.alive[row]]
+
+    def view(self, row: int) -> 'EnemyAI':
+        return EnemyAI.view(self, row)
+
+    def move_row(self, row: int, x: float, y: float):
+        self.x[row], self.y[row] = x, y
+        self.grid.move(row, x, y)
+
+    def query(self, x: float, y: float, radius: float) -> List[int]:
+        # Live rows within radius (inclusive) of (x, y): AoE targeting, see spatial_system.aoe_targets
+        r2 = radius * radius
+        xs, ys = self.x, self.y
+        return [row for row in self.grid.candidates(x, y, radius)
+                if (xs[row] - x) ** 2 + (ys[row] - y) ** 2 <= r2]
+
+    def _aggro_rows(self, players) -> dict:
+        # Row -> nearest player strictly inside aggro_radius, gathered from nearby cells only
+        radius = self.aggro_radius
+        r2 = radius * radius
+        xs, ys = self.x, self.y
+        best = {}
+        for i, (px, py) in enumerate(players):
+            for row in self.grid.candidates(px, py, radius):
+                d2 = (xs[row] - px) ** 2 + (ys[row] - py) ** 2
+                if d2 < r2 and (row not in best or d2 < best[row][0]):
+                    best[row] = (d2, i)
+        return {row: i for row, (_, i) in best.items()}
+
+    def route(self, row: int) -> List[Tuple[float, float]]:
+        start, length = int(self.route_start[row]), int(self.route_len[row])
+        return list(zip(self._route_x[start:start + length], self._route_y[start:start + length]))
+
+    def _set_route(self, row: int, points):
+        self._route_garbage += int(self.route_len[row])
+        self.route_start[row] = len(self._route_x)
+        self.route_len[row] = len(points)
+        self.leg[row] = -1
+        self._route_legs.pop(row, None)
+        for px, py in points:
+            self._route_x.append(px)
+            self._route_y.append(py)
+
+    def _compact_routes(self):
+        xs, ys = [], []
+        for row in range(self._size):
+            start, length = int(self.route_start[row]), int(self.route_len[row])
+            self.route_start[row] = len(xs)
+            xs.extend(self._route_x[start:start + length])
+            ys.extend(self._route_y[start:start + length])
+        self._route_x, self._route_y = xs, ys
+        self._route_garbage = 0
+
+    # --- per-row logic (EnemyAI views and the no-NumPy path) ---
+
+    def update_row(self, row: int, player_positions):
+        # Chase the nearest player in range, patrol if the enemy has a route, else idle
+        self.players = player_positions
+        r2 = self.aggro_radius * self.aggro_radius
+        x, y = self.x[row], self.y[row]
+        target, best = -1, r2
+        for i, (px, py) in enumerate(player_positions):
+            d2 = (x - px) ** 2 + (y - py) ** 2
+            if d2 < best:
+                target, best = i, d2
+        self.target[row] = target
+        if target >= 0:
+            self.state[row] = CHASE
+            self.leg[row] = -1
+        elif self.route_len[row]:
+            self.state[row] = PATROL
+        else:
+            self.state[row] = IDLE
+
+    def _walk_row(self, row: int, gx: float, gy: float, field) -> bool:
+        # One tick toward (gx, gy), via the field's next cell if there is one; True once at the goal
+        x, y = float(self.x[row]), float(self.y[row])
+        wx, wy, direct = gx, gy, True
+        if field is not None:
+            grid = self.pathfinder.grid
+            step = int(field.next_cell[grid.index_of(x, y)])
+            if step >= 0:
+                wx, wy = grid.center(step)
+                direct = False
+        dx, dy = wx - x, wy - y
+        d = math.hypot(dx, dy)
+        if d <= self.speed:
+            self.move_row(row, wx, wy)
+            return direct
+        self.move_row(row, x + dx / d * self.speed, y + dy / d * self.speed)
+        return False
+
+    def _check_legs(self):
+        # Planned legs go stale when the pathfinder's grid changes
+        finder = self.pathfinder
+        if finder is not None and finder.grid.version != self._legs_version:
+            self._legs.clear()
+            self._route_legs.clear()
+            for row in range(self._size):
+                self.leg[row] = -1
+            self._legs_version = finder.grid.version
+
+    def _plan_row(self, row: int):
+        # Waypoints from the row's position to its current route point
+        index, length = int(self.patrol_index[row]), int(self.route_len[row])
+        start_index = int(self.route_start[row])
+        goal = (self._route_x[start_index + index], self._route_y[start_index + index])
+        start = (float(self.x[row]), float(self.y[row]))
+        previous = start_index + (index - 1) % length
+        on_route = start == (self._route_x[previous], self._route_y[previous])
+        finder = self.pathfinder
+        path = self._route_legs.get(row, {}).get(index) if on_route else None
+        if path is None:
+            if finder is not None and not finder.line_clear(start, goal):
+                path = finder.path(start, goal)  # None if unreachable: walk straight at it
+            path = path or [goal]
+            if on_route and finder is not None:
+                self._route_legs.setdefault(row, {})[index] = path
+        self._legs[row] = path
+        self.leg[row] = 0
+        self.way_x[row], self.way_y[row] = path[0]
+
+    def _reach_waypoint(self, row: int):
+        # Next waypoint of the leg, or, at the route point, the next route point
+        path = self._legs.get(row)
+        leg = int(self.leg[row]) + 1
+        if path is not None and leg < len(path):
+            self.leg[row] = leg
+            self.way_x[row], self.way_y[row] = path[leg]
+        else:
+            self.patrol_index[row] = (int(self.patrol_index[row]) + 1) % int(self.route_len[row])
+            self.leg[row] = -1
+            self._legs.pop(row, None)
+
+    def patrol_row(self, row: int):
+        # Walk the current leg toward the route point; the next one becomes current on arrival
+        if self.route_len[row]:
+            self._check_legs()
+            if self.leg[row] < 0:
+                self._plan_row(row)
+            if self._walk_row(row, float(self.way_x[row]), float(self.way_y[row]), None):
+                self._reach_waypoint(row)
+
+    def chase_row(self, row: int):
+        # Walk toward the targeted player, sharing that player's flow field
+        target = int(self.target[row])
+        if 0 <= target < len(self.players):
+            px, py = self.players[target]
+            finder = self.pathfinder
+            field = finder.player_field(target, (px, py)) if finder is not None else None
+            self._walk_row(row, px, py, field)
+
+    def act_row(self, row: int):
+        if self.state[row] == PATROL:
+            self.patrol_row(row)
+        elif self.state[row] == CHASE:
+            self.chase_row(row)
+        # attack / flee: not implemented yet; idle does nothing
+
+    # --- whole-batch steps ---
+
+    def update(self, player_pos):
+        """State transitions for every live enemy against one player position or a party."""
+        # Distance checks only run for enemies in the grid cells around each player
+        self.players = players = _as_positions(player_pos)
+        near = self._aggro_rows(players)
+        n = self._size
+        if numpy is None:
+            for row in range(n):
+                if self.alive[row]:
+                    self.target[row] = near.get(row, -1)
+                    if row in near:
+                        self.leg[row] = -1
+                    self.state[row] = CHASE if row in near else PATROL if self.route_len[row] else IDLE
+            return
+        alive = self.alive[:n]
+        state = numpy.where(self.route_len[:n] > 0, PATROL, IDLE)
+        self.state[:n] = numpy.where(alive, state, self.state[:n])
+        self.target[:n] = -1
+        if near:
+            rows = numpy.fromiter(near.keys(), dtype=numpy.int64, count=len(near))
+            self.state[rows] = CHASE
+            self.leg[rows] = -1
+            self.target[rows] = numpy.fromiter(near.values(), dtype=numpy.int32, count=len(near))
+
+    def act(self):
+        # Patrollers and chasers each walk one tick toward their goal
+        n = self._size
+        if numpy is None:
+            for row in range(n):
+                if self.alive[row]:
+                    self.act_row(row)
+            return
+        alive, state, target = self.alive[:n], self.state[:n], self.target[:n]
+        patrol = numpy.flatnonzero(alive & (state == PATROL) & (self.route_len[:n] > 0))
+        chase = numpy.flatnonzero(alive & (state == CHASE) & (target >= 0) & (target < len(self.players)))
+        if not len(patrol) and not len(chase):
+            return
+        self._check_legs()
+        for row in patrol[self.leg[patrol] < 0].tolist():
+            self._plan_row(row)
+        rows = numpy.concatenate((patrol, chase))
+        targets = self.target[chase]
+        party = numpy.asarray(self.players, dtype=float).reshape(-1, 2)
+        x, y = self.x[rows], self.y[rows]
+        wx = numpy.concatenate((self.way_x[patrol], party[targets, 0]))
+        wy = numpy.concatenate((self.way_y[patrol], party[targets, 1]))
+        finder = self.pathfinder
+        if finder is not None and len(chase):
+            # Chasers of one player share its flow field
+            grid = finder.grid
+            cells = grid.indices_of(x[len(patrol):], y[len(patrol):])
+            order = numpy.argsort(targets, kind='stable')
+            bounds = numpy.flatnonzero(numpy.diff(targets[order])) + 1
+            for group in numpy.split(order, bounds):
+                player = int(targets[group[0]])
+                field = finder.player_field(player, self.players[player])
+                step = field.next_cell[cells[group]]
+                has = step >= 0
+                group, step = group[has] + len(patrol), step[has]
+                wx[group] = (step % grid.width + 0.5) * grid.cell_size
+                wy[group] = (step // grid.width + 0.5) * grid.cell_size
+        dx, dy = wx - x, wy - y
+        d = numpy.hypot(dx, dy)
+        arrived = d <= self.speed
+        d[arrived] = 1.0
+        new_x = numpy.where(arrived, wx, x + dx / d * self.speed)
+        new_y = numpy.where(arrived, wy, y + dy / d * self.speed)
+        for row in patrol[arrived[:len(patrol)]].tolist():
+            self._reach_waypoint(row)
+        # Only rows that crossed into another cell touch the spatial grid's buckets
+        size = self.grid.cell_size
+        crossed = ((numpy.floor(new_x / size) != numpy.floor(x / size))
+                   | (numpy.floor(new_y / size) != numpy.floor(y / size)))
+        self.x[rows] = new_x
+        self.y[rows] = new_y
+        for row, cx, cy in zip(rows[crossed].tolist(), new_x[crossed].tolist(), new_y[crossed].tolist()):
+            self.grid.move(row, cx, cy)
+
+    def step(self, player_pos):
+        self.update(player_pos)
+        self.act()
+
+
+def _as_positions(player_pos) -> List[Tuple[float, float]]:
+    # One (x, y) or a sequence of them
+    if numpy is not None and isinstance(player_pos, numpy.ndarray):
+        return [tuple(p) for p in player_pos.reshape(-1, 2).tolist()]
+    if len(player_pos) == 2 and not hasattr(player_pos[0], '__len__'):
+        return [tuple(player_pos)]
+    return [tuple(p) for p in player_pos]
+
+
+class EnemyAI:
+    """
+    One enemy's AI: a view over a row of a shared or private EnemyAIBatch.
+    """
+    STATES = STATES
+    __slots__ = ('batch', 'row')
+
+    def __init__(self, enemy, patrol_points=None, batch: Optional[EnemyAIBatch] = None):
+        self.batch = batch if batch is not None else EnemyAIBatch(capacity=1)
+        self.row = self.batch.add(enemy, patrol_points)
+
+    @classmethod
+    def view(cls, batch: EnemyAIBatch, row: int) -> 'EnemyAI':
+        ai = cls.__new__(cls)
+        ai.batch, ai.row = batch, row
+        return ai
+
+    @property
+    def enemy(self):
+        return self.batch.enemies[self.row]
+
+    @property
+    def state(self) -> str:
+        return STATES[int(self.batch.state[self.row])]
+
+    @state.setter
+    def state(self, value: str):
+        self.batch.state[self.row] = STATES.index(value)
+
+    @property
+    def patrol_points(self) -> List[Tuple[float, float]]:
+        return self.batch.route(self.row)
+
+    @patrol_points.setter
+    def patrol_points(self, points):
+        self.batch._set_route(self.row, points or [])
+        self.batch.patrol_index[self.row] = 0
+
+    @property
+    def current_patrol_index(self) -> int:
+        return int(self.batch.patrol_index[self.row])
+
+    @current_patrol_index.setter
+    def current_patrol_index(self, index: int):
+        self.batch.patrol_index[self.row] = index
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        return float(self.batch.x[self.row]), float(self.batch.y[self.row])
+
+    @position.setter
+    def position(self, pos):
+        self.batch.move_row(self.row, *pos)
+
+    def update(self, player_pos):
+        self.batch.update_row(self.row, _as_positions(player_pos))
+
+    def _distance_to(self, pos):
+        ex, ey = self.position
+        px, py = pos
+        return ((ex - px) ** 2 + (ey - py) ** 2) ** 0.5
+
+    def _patrol(self):
+        self.batch.patrol_row(self.row)
+
+    def act(self):
+        self.batch.act_row(self.row)
+
+    def __repr__(self):
+        return f"EnemyAI({self.state} at {self.position})"
+
+
+# Example usage / benchmark
+if __name__ == "__main__":
+    import random
+    rng = random.Random(7)
+    n, ticks = 10000, 100
+    party = [(rng.uniform(0, 500), rng.uniform(0, 500)) for _ in range(4)]
+    batch = EnemyAIBatch(capacity=n)
+    for i in range(n):
+        route = [(rng.uniform(0, 500), rng.uniform(0, 500)) for _ in range(rng.randint(0, 4))]
+        batch.add(None, route, position=(rng.uniform(0, 500), rng.uniform(0, 500)))
+    start = time.perf_counter()
+    for _ in range(ticks):
+        batch.step(party)
+    elapsed = time.perf_counter() - start
+    path = 'NumPy' if numpy is not None else 'pure Python'
+    print(f"{n} enemies, {len(party)} players, {path}: {elapsed / ticks * 1000:.2f} ms/tick")
+    views = [batch.view(row) for row in batch.rows()]
+    start = time.perf_counter()
+    for _ in range(10):
+        for ai in views:
+            ai.update(party)
+            ai.act()
+    print(f"  per-enemy views: {(time.perf_counter() - start) / 10 * 1000:.2f} ms/tick")
+    print(f"  states: {dict((s, int(sum(1 for r in batch.rows() if batch.state[r] == i))) for i, s in enumerate(STATES))}")
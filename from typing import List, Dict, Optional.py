@@ -1,69 +1,503 @@
 from typing import List, Dict, Optional
+from collections.abc import MutableMapping
+import sys
+import weakref
 import tkinter as tk
 from tkinter import messagebox
 
 # diablo4_inventory.py
 
 
+# Interned type/rarity codes: instances keep a small int, the string lives here once
+ITEM_TYPES: List[str] = []
+RARITIES: List[str] = []
+_TYPE_CODES: Dict[str, int] = {}
+_RARITY_CODES: Dict[str, int] = {}
+
+
+def _code(value: str, names: List[str], codes: Dict[str, int]) -> int:
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(names)
+        names.append(sys.intern(value))
+    return code
+
+
+class ItemBase:
+    """
+    Flyweight item definition shared by every copy of an item.
+    """
+    __slots__ = ('base_id', 'name', 'type_code', 'rarity_code', 'size', 'stat_keys', 'base_rolls', '__weakref__')
+
+    # Ad-hoc bases live only as long as some item uses them
+    _registry: 'weakref.WeakValueDictionary[tuple, ItemBase]' = weakref.WeakValueDictionary()
+    _by_id: Dict[str, 'ItemBase'] = {}
+    _by_id_version: Optional[int] = None  # game_assets.ASSET_VERSION _by_id was built from
+
+    def __init__(self, base_id: Optional[str], name: str, item_type: str, rarity: str, size: tuple,
+                 stat_keys: tuple, base_rolls: tuple = ()):
+        self.base_id = base_id
+        self.name = sys.intern(name)
+        self.type_code = _code(item_type, ITEM_TYPES, _TYPE_CODES)
+        self.rarity_code = _code(rarity, RARITIES, _RARITY_CODES)
+        self.size = tuple(size)
+        self.stat_keys = tuple(sys.intern(k) for k in stat_keys)
+        self.base_rolls = base_rolls or (0,) * len(stat_keys)
+
+    @property
+    def item_type(self) -> str:
+        return ITEM_TYPES[self.type_code]
+
+    @property
+    def rarity(self) -> str:
+        return RARITIES[self.rarity_code]
+
+    @property
+    def key(self) -> tuple:
+        return (self.name, self.item_type, self.rarity, self.size, self.stat_keys)
+
+    @classmethod
+    def intern(cls, name: str, item_type: str, rarity: str, size: tuple, stat_keys: tuple) -> 'ItemBase':
+        key = (name, item_type, rarity, tuple(size), tuple(stat_keys))
+        base = cls._registry.get(key)
+        if base is None:
+            base = cls(None, name, item_type, rarity, size, stat_keys)
+            cls._registry[key] = base
+        return base
+
+    @classmethod
+    def get(cls, base_id: str) -> 'ItemBase':
+        # Base definition for a game_assets.ITEMS id (KeyError if unknown)
+        import game_assets
+        if cls._by_id_version != game_assets.ASSET_VERSION:
+            cls._by_id.clear()
+            cls._by_id_version = game_assets.ASSET_VERSION
+        base = cls._by_id.get(base_id)
+        if base is None:
+            spec = game_assets.ITEMS[base_id]
+            stats = dict(spec.get('stats', {}))
+            for field in ('damage', 'heal'):
+                if field in spec:
+                    stats[field] = spec[field]
+            base = cls(base_id, spec['name'], spec.get('type', 'misc'), spec.get('rarity', 'common'),
+                       spec.get('size', (1, 1)), tuple(stats), tuple(stats.values()))
+            cls._by_id[base_id] = base
+        return base
+
+    @classmethod
+    def clear_asset_cache(cls):
+        # Drop bases built from game_assets.ITEMS; existing items keep the base they have
+        cls._by_id.clear()
+
+    def __reduce__(self):
+        # Pickled by reference; pickle's memo writes each base once per save
+        if self.base_id is not None:
+            return (_asset_base, (self.base_id,))
+        return (_interned_base, self.key)
+
+
+class ItemStats(MutableMapping):
+    """Dict-like view of an item's stats; writes go straight to the item's rolls."""
+    __slots__ = ('_item',)
+
+    def __init__(self, item: 'Item'):
+        self._item = item
+
+    def __getitem__(self, key: str) -> int:
+        try:
+            return self._item.rolls[self._item.base.stat_keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: int):
+        item = self._item
+        keys = item.base.stat_keys
+        if key in keys:
+            rolls = list(item.rolls)
+            rolls[keys.index(key)] = value
+            item.rolls = tuple(rolls)
+        else:
+            item.stats = {**dict(zip(keys, item.rolls)), key: value}
+
+    def __delitem__(self, key: str):
+        stats = dict(self)
+        del stats[key]
+        self._item.stats = stats
+
+    def __iter__(self):
+        return iter(self._item.base.stat_keys)
+
+    def __len__(self) -> int:
+        return len(self._item.base.stat_keys)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class Item:
+    """An item instance: a shared ItemBase plus this copy's rolled stat values."""
+    __slots__ = ('base', 'rolls')
+
     def __init__(self, name: str, item_type: str, rarity: str, stats: Dict[str, int], size: tuple = (1,1)):
-        self.name = name
-        self.item_type = item_type  # e.g., 'Weapon', 'Armor', 'Potion'
-        self.rarity = rarity        # e.g., 'Common', 'Rare', 'Legendary'
-        self.stats = stats
-        self.size = size            # (width, height) for grid placement
+        self.base = ItemBase.intern(name, item_type, rarity, size, tuple(stats))
+        self.rolls = tuple(stats.values())
+
+    @classmethod
+    def from_base(cls, base: ItemBase, rolls: Optional[tuple] = None) -> 'Item':
+        item = cls.__new__(cls)
+        item.base = base
+        item.rolls = base.base_rolls if rolls is None else tuple(rolls)
+        return item
+
+    @classmethod
+    def from_asset(cls, base_id: str, rolls: Optional[tuple] = None) -> 'Item':
+        return cls.from_base(ItemBase.get(base_id), rolls)
+
+    @property
+    def name(self) -> str:
+        return self.base.name
+
+    @property
+    def item_type(self) -> str:
+        return ITEM_TYPES[self.base.type_code]  # e.g., 'Weapon', 'Armor', 'Potion'
+
+    @property
+    def rarity(self) -> str:
+        return RARITIES[self.base.rarity_code]  # e.g., 'Common', 'Rare', 'Legendary'
+
+    @rarity.setter
+    def rarity(self, rarity: str):
+        self.base = ItemBase.intern(self.name, self.item_type, rarity, self.size, self.base.stat_keys)
+
+    @property
+    def size(self) -> tuple:
+        return self.base.size  # (width, height) for grid placement
+
+    @property
+    def stats(self) -> ItemStats:
+        # Live view: item.stats[k] = v and item.stats.update(...) change this item's rolls
+        return ItemStats(self)
+
+    @stats.setter
+    def stats(self, stats: Dict[str, int]):
+        if tuple(stats) != self.base.stat_keys:
+            self.base = ItemBase.intern(self.name, self.item_type, self.rarity, self.size, tuple(stats))
+        self.rolls = tuple(stats.values())
+
+    def stat(self, key: str, default: int = 0) -> int:
+        try:
+            return self.rolls[self.base.stat_keys.index(key)]
+        except ValueError:
+            return default
+
+    def set_stat(self, key: str, value: int):
+        self.stats[key] = value
+
+    def __reduce__(self):
+        return (_item, (self.base, self.rolls))
 
     def __repr__(self):
         return f"{self.rarity} {self.name} ({self.item_type}) {self.stats}"
 
+# Module-level constructors keep pickles small: a global is memoized, a bound method is not
+def _asset_base(base_id: str) -> ItemBase:
+    return ItemBase.get(base_id)
+
+
+def _interned_base(*key) -> ItemBase:
+    return ItemBase.intern(*key)
+
+
+def _item(base: ItemBase, rolls: tuple) -> Item:
+    return Item.from_base(base, rolls)
+
+
+class FreeRectIndex:
+    """
+    Maximal free rectangles (MaxRects) of an inventory grid, as (x, y, w, h).
+    """
+    def __init__(self, width: int, height: int, rects: Optional[List[tuple]] = None):
+        self.width = width
+        self.height = height
+        self.rects: List[tuple] = [(0, 0, width, height)] if rects is None else rects
+
+    @classmethod
+    def from_rows(cls, rows: List[int], width: int, height: int) -> 'FreeRectIndex':
+        # Rebuild from occupancy bitmasks: every maximal run of free columns over rows y..y2
+        # that cannot grow up or down is a maximal rectangle
+        full = (1 << width) - 1
+        free = [~row & full for row in rows]
+        rects = []
+        for y in range(height):
+            acc = full
+            for y2 in range(y, height):
+                acc &= free[y2]
+                if not acc:
+                    break
+                runs = acc
+                while runs:
+                    x0 = (runs & -runs).bit_length() - 1
+                    shifted = runs >> x0
+                    length = (shifted ^ (shifted + 1)).bit_length() - 1
+                    mask = ((1 << length) - 1) << x0
+                    runs &= ~mask
+                    grows_up = y > 0 and free[y-1] & mask == mask
+                    grows_down = y2 < height - 1 and free[y2+1] & mask == mask
+                    if not grows_up and not grows_down:
+                        rects.append((x0, y, length, y2 - y + 1))
+        return cls(width, height, rects)
+
+    def find(self, w: int, h: int):
+        # Top-most, then left-most spot: identical to a row-major first-fit scan
+        best = None
+        for x, y, rw, rh in self.rects:
+            if rw >= w and rh >= h and (best is None or (y, x) < best):
+                best = (y, x)
+        return None if best is None else (best[1], best[0])
+
+    def find_best(self, w: int, h: int):
+        # Best-short-side-fit: the rectangle the item fills most snugly, ties top-most, left-most
+        best = None
+        for x, y, rw, rh in self.rects:
+            if rw >= w and rh >= h:
+                dw, dh = rw - w, rh - h
+                score = (min(dw, dh), max(dw, dh), y, x)
+                if best is None or score < best:
+                    best = score
+        return None if best is None else (best[3], best[2])
+
+    def copy(self) -> 'FreeRectIndex':
+        return FreeRectIndex(self.width, self.height, list(self.rects))
+
+    def place(self, x: int, y: int, w: int, h: int):
+        # Split every rectangle the placed item overlaps into its free remainders
+        kept, split = [], []
+        for rect in self.rects:
+            rx, ry, rw, rh = rect
+            if x >= rx + rw or x + w <= rx or y >= ry + rh or y + h <= ry:
+                kept.append(rect)
+                continue
+            if x > rx:
+                split.append((rx, ry, x - rx, rh))
+            if x + w < rx + rw:
+                split.append((x + w, ry, rx + rw - x - w, rh))
+            if y > ry:
+                split.append((rx, ry, rw, y - ry))
+            if y + h < ry + rh:
+                split.append((rx, y + h, rw, ry + rh - y - h))
+        # Drop remainders that sit inside another free rectangle; untouched rectangles
+        # are already maximal and cannot be inside a remainder of a different one
+        split = list(dict.fromkeys(split))
+        for rect in split:
+            rx, ry, rw, rh = rect
+            if not any(o is not rect and o[0] <= rx and o[1] <= ry and rx + rw <= o[0] + o[2]
+                       and ry + rh <= o[1] + o[3] for o in kept + split):
+                kept.append(rect)
+        self.rects = kept
+
+    def largest_area(self) -> int:
+        return max((w * h for _, _, w, h in self.rects), default=0)
+
+
 class Inventory:
     def __init__(self, width: int = 10, height: int = 4):
         self.width = width
         self.height = height
         self.grid: List[List[Optional[Item]]] = [[None for _ in range(width)] for _ in range(height)]
-        self.items: List[Item] = []
+        # item -> (x, y, w, h) in placement order, and name -> items (dicts keep insertion order),
+        # so lookups and removal touch only the item's own cells
+        self._placed: Dict[Item, tuple] = {}
+        self._by_name: Dict[str, Dict[Item, None]] = {}
+        # Occupancy bitmask per row (bit x set = cell taken); fit tests are a few ANDs per row.
+        # self.grid stays as the item view and is kept in sync by _fill().
+        self._rows: List[int] = [0] * height
+        self._full_row = (1 << width) - 1
+        # Free-rectangle index; placements update it in place, removals rebuild it lazily
+        self._free: Optional[FreeRectIndex] = FreeRectIndex(width, height)
+
+    @property
+    def items(self) -> List[Item]:
+        return list(self._placed)
 
     def can_place(self, item: Item, x: int, y: int) -> bool:
-        for dx in range(item.size[0]):
-            for dy in range(item.size[1]):
-                if x+dx >= self.width or y+dy >= self.height:
-                    return False
-                if self.grid[y+dy][x+dx] is not None:
-                    return False
+        w, h = item.size
+        if x < 0 or y < 0 or x + w > self.width or y + h > self.height:
+            return False
+        mask = ((1 << w) - 1) << x
+        for row in self._rows[y:y+h]:
+            if row & mask:
+                return False
         return True
 
-    def add_item(self, item: Item) -> bool:
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.can_place(item, x, y):
-                    for dx in range(item.size[0]):
-                        for dy in range(item.size[1]):
-                            self.grid[y+dy][x+dx] = item
-                    self.items.append(item)
-                    return True
-        return False
+    def free_rects(self) -> FreeRectIndex:
+        if self._free is None:
+            self._free = FreeRectIndex.from_rows(self._rows, self.width, self.height)
+        return self._free
+
+    def find_spot(self, w: int, h: int):
+        # Where a w x h item would go: first free (x, y) in row-major order, or None
+        if w > self.width or h > self.height or w <= 0 or h <= 0:
+            return None
+        return self.free_rects().find(w, h)
+
+    def _fill(self, item: Optional[Item], x: int, y: int, w: int, h: int):
+        mask = ((1 << w) - 1) << x
+        for row in range(y, y + h):
+            if item is None:
+                self._rows[row] &= ~mask
+            else:
+                self._rows[row] |= mask
+            self.grid[row][x:x+w] = [item] * w
+        if item is None:
+            self._free = None
+        elif self._free is not None:
+            self._free.place(x, y, w, h)
+
+    def _place(self, item: Item, x: int, y: int):
+        w, h = item.size
+        self._fill(item, x, y, w, h)
+        self._placed[item] = (x, y, w, h)
+        self._by_name.setdefault(item.name, {})[item] = None
+
+    def _unplace(self, item: Item) -> tuple:
+        rect = self._placed.pop(item)
+        self._fill(None, *rect)
+        named = self._by_name[item.name]
+        del named[item]
+        if not named:
+            del self._by_name[item.name]
+        return rect
+
+    def add_item(self, item: Item, repack: bool = False) -> bool:
+        # repack: if there is no room, try auto_pack() with the new item before giving up
+        if item in self._placed:
+            return False
+        spot = self.find_spot(*item.size)
+        if spot is None:
+            return repack and self.auto_pack(extra=[item])
+        self._place(item, *spot)
+        return True
+
+    @staticmethod
+    def _plan_pack(items: List[Item], width: int, height: int):
+        # Place items into an empty grid in the given order; None if one does not fit
+        free = FreeRectIndex(width, height)
+        plan = []
+        for item in items:
+            w, h = item.size
+            spot = free.find(w, h) if w <= width and h <= height else None
+            if spot is None:
+                return None, free
+            free.place(spot[0], spot[1], w, h)
+            plan.append((item, spot))
+        return plan, free
+
+    @staticmethod
+    def _largest_first(items: List[Item]) -> List[Item]:
+        return sorted(items, key=lambda i: (-i.size[0] * i.size[1], -i.size[1], -i.size[0]))
+
+    def _plan_batch(self, items: List[Item], best_fit: bool):
+        # Place items into a scratch copy of the free index; returns (plan, rejected, free, area)
+        free = self.free_rects().copy()
+        find = free.find_best if best_fit else free.find
+        plan, rejected, area = [], [], 0
+        for item in items:
+            w, h = item.size
+            spot = find(w, h) if 0 < w <= self.width and 0 < h <= self.height else None
+            if spot is None:
+                rejected.append(item)
+                continue
+            free.place(spot[0], spot[1], w, h)
+            plan.append((item, spot))
+            area += w * h
+        return plan, rejected, free, area
+
+    def add_items(self, items: List[Item], partial: bool = False) -> List[Item]:
+        """Pack a batch largest first; returns the items that did not fit."""
+        # Best-short-side-fit and the given order are planned too and the plan placing the most
+        # cells wins. The inventory only changes when everything fits, unless partial=True.
+        batch, rejected, seen = [], [], set()
+        for item in items:
+            if item in self._placed or id(item) in seen:
+                rejected.append(item)
+            else:
+                seen.add(id(item))
+                batch.append(item)
+        plan, missed, free, area = self._plan_batch(self._largest_first(batch), best_fit=False)
+        if missed:
+            for alt in (self._plan_batch(self._largest_first(batch), best_fit=True),
+                        self._plan_batch(batch, best_fit=False)):
+                if alt[3] > area:
+                    plan, missed, free, area = alt
+        rejected.extend(missed)
+        if rejected and not partial:
+            return rejected
+        # Apply the plan; the planned index already reflects it, so skip per-item index updates
+        self._free = None
+        for item, (x, y) in plan:
+            self._place(item, x, y)
+        self._free = free
+        return rejected
+
+    def auto_pack(self, extra: Optional[List[Item]] = None) -> bool:
+        """Re-place every item (plus `extra`) big first; False and no change if nothing fits."""
+        # Of the orderings tried, the one leaving the largest free rectangle wins
+        items = self.items + list(extra or [])
+        orders = (
+            self._largest_first(items),
+            sorted(items, key=lambda i: (-i.size[1], -i.size[0])),
+            sorted(items, key=lambda i: (-i.size[0], -i.size[1])),
+        )
+        best = None
+        for order in orders:
+            plan, free = self._plan_pack(order, self.width, self.height)
+            if plan is not None and (best is None or free.largest_area() > best[1].largest_area()):
+                best = (plan, free)
+        if best is None:
+            return False
+        self.grid = [[None for _ in range(self.width)] for _ in range(self.height)]
+        self._rows = [0] * self.height
+        self._placed = {}
+        self._by_name = {}
+        self._free = None
+        for item, (x, y) in best[0]:
+            self._place(item, x, y)
+        self._free = best[1]
+        return True
 
     def remove_item(self, item: Item) -> bool:
-        if item in self.items:
-            for y in range(self.height):
-                for x in range(self.width):
-                    if self.grid[y][x] == item:
-                        self.grid[y][x] = None
-            self.items.remove(item)
+        if item in self._placed:
+            self._unplace(item)
+            return True
+        return False
+
+    def move_item(self, item: Item, x: int, y: int) -> bool:
+        # Move a placed item so its top-left corner is at (x, y); the item may overlap its old cells
+        if item not in self._placed:
+            return False
+        old_x, old_y, _, _ = self._unplace(item)
+        if self.can_place(item, x, y):
+            self._place(item, x, y)
             return True
+        self._place(item, old_x, old_y)
         return False
 
+    def locate(self, item: Item) -> Optional[tuple]:
+        # (x, y, w, h) of a placed item, or None
+        return self._placed.get(item)
+
     def list_items(self) -> List[Item]:
         return self.items
 
     def find_item(self, name: str) -> Optional[Item]:
-        for item in self.items:
-            if item.name == name:
-                return item
-        return None
+        named = self._by_name.get(name)
+        return next(iter(named)) if named else None
+
+    def find_items(self, name: str) -> List[Item]:
+        return list(self._by_name.get(name, ()))
 
     def sort_items(self, key: str = "rarity"):
-        self.items.sort(key=lambda item: getattr(item, key))
+        self._placed = {item: self._placed[item] for item in sorted(self._placed, key=lambda item: getattr(item, key))}
 
     def display(self):
         for row in self.grid:
@@ -78,6 +512,8 @@ class InventoryGUI:
         self.grid_frame.pack(padx=10, pady=10)
         self.refresh_button = tk.Button(self.root, text="Refresh", command=self.display_grid)
         self.refresh_button.pack(pady=5)
+        self.pack_button = tk.Button(self.root, text="Auto Pack", command=self.auto_pack)
+        self.pack_button.pack(pady=5)
         self.items_listbox = tk.Listbox(self.root, width=40)
         self.items_listbox.pack(padx=10, pady=10)
         self.display_grid()
@@ -93,6 +529,11 @@ class InventoryGUI:
                 label.grid(row=y, column=x, padx=1, pady=1)
         self.display_items()
 
+    def auto_pack(self):
+        if not self.inventory.auto_pack():
+            messagebox.showinfo("Inventory", "Could not repack the inventory.")
+        self.display_grid()
+
     def display_items(self):
         self.items_listbox.delete(0, tk.END)
         for item in self.inventory.items:
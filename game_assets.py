@@ -426,6 +426,34 @@ CONTROLLER_BINDINGS: Dict[str, str] = {
     # ... add more bindings ...
 }
 
+# Bumped whenever ITEMS or MONSTERS change at runtime; caches built from assets
+# (item bases, compiled drop tables) compare against it and rebuild when it moves.
+ASSET_VERSION = 0
+
+def mark_assets_changed():
+    global ASSET_VERSION
+    ASSET_VERSION += 1
+
+# World tiers run 1..MAX_WORLD_TIER (see character_system.WorldDifficulty)
+MAX_WORLD_TIER = 9
+
+def check_world_tier(world_tier) -> int:
+    if isinstance(world_tier, bool) or not isinstance(world_tier, int) or not 1 <= world_tier <= MAX_WORLD_TIER:
+        raise ValueError(f"World tier must be an integer from 1 to {MAX_WORLD_TIER}, got {world_tier!r}.")
+    return world_tier
+
+def register_item(item_id: str, data: Dict[str, Any]):
+    ITEMS[item_id] = data
+    mark_assets_changed()
+
+def register_monster(monster_id: str, data: Dict[str, Any]):
+    if 'world_tier' in data:
+        check_world_tier(data['world_tier'])
+    if not 0 <= data.get('drop_chance', 0) <= 1:
+        raise ValueError(f"Monster {monster_id!r}: drop_chance must be between 0 and 1.")
+    MONSTERS[monster_id] = data
+    mark_assets_changed()
+
 # Fetch functions for new world assets
 def get_continent(continent_id: str) -> Dict[str, Any]:
     return CONTINENTS.get(continent_id, {})
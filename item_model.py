@@ -0,0 +1,36 @@
+import importlib.util
+import os
+import sys
+
+# Single loader for the item/inventory model, which lives in a file whose name is not a
+# valid module name. It is executed once, on first import of this module, and every
+# subsystem shares the resulting classes, so hot loops never touch the import machinery.
+
+ITEM_MODULE_NAME = 'from typing import List, Dict, Optional'
+ITEM_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'from typing import List, Dict, Optional.py')
+
+
+def _load():
+    mod = sys.modules.get(ITEM_MODULE_NAME)
+    if mod is None:
+        spec = importlib.util.spec_from_file_location(ITEM_MODULE_NAME, ITEM_MODULE_PATH)
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules[ITEM_MODULE_NAME] = mod
+        try:
+            spec.loader.exec_module(mod)
+        except BaseException:
+            del sys.modules[ITEM_MODULE_NAME]
+            raise
+    return mod
+
+
+module = _load()
+Item = module.Item
+ItemBase = module.ItemBase
+Inventory = module.Inventory
+InventoryGUI = module.InventoryGUI
+
+# Fast factories: plain references, no lookups per call
+make_item = Item
+item_from_base = Item.from_base
+item_from_asset = Item.from_asset
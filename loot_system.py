@@ -0,0 +1,306 @@
+import random
+import time
+from typing import List, Optional
+
+import game_assets
+import item_model
+import rng_system
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Weighted loot rolls. Weight tables are compiled once into Walker alias tables, so every
+# draw is one uniform number, one index and one compare, whatever the number of outcomes.
+
+LOOT_RARITIES = [
+    {'name': 'Common', 'color': '#bbb', 'weight': 60},
+    {'name': 'Magic', 'color': '#4b8cff', 'weight': 25},
+    {'name': 'Rare', 'color': '#ffe14b', 'weight': 10},
+    {'name': 'Legendary', 'color': '#ff7f27', 'weight': 4},
+    {'name': 'Unique', 'color': '#b400ff', 'weight': 1},
+]
+
+LOOT_ITEM_TYPES = [
+    {'name': 'Weapon', 'weight': 1},
+    {'name': 'Armor', 'weight': 1},
+]
+
+# Affixes rolled onto Magic and better drops; 'stat' is the rolled stat the affix adds
+LOOT_AFFIXES = [
+    {'name': 'Mighty', 'stat': 'Strength', 'weight': 4},
+    {'name': 'Arcane', 'stat': 'Intelligence', 'weight': 4},
+    {'name': 'Swift', 'stat': 'Attack Speed', 'weight': 2},
+    {'name': 'Vampiric', 'stat': 'Life Leech', 'weight': 1},
+]
+
+POWER_RANGE = (10, 100)
+AFFIX_RANGE = (1, 20)
+
+# Monster drop tables: chance that a kill drops anything, and how much each world tier
+# above 1 multiplies an entry's weight per rarity step above Common
+BASE_DROP_CHANCE = 0.3
+TIER_DROP_BONUS = 0.1
+TIER_RARITY_BONUS = 0.25
+# game_assets rarities that LOOT_RARITIES does not name
+ASSET_RARITY_ALIASES = {'epic': 'Rare'}
+
+def _is_numpy_rng(rng) -> bool:
+    return numpy is not None and isinstance(rng, numpy.random.Generator)
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted draw."""
+    __slots__ = ('n', 'prob', 'alias', '_np')
+
+    def __init__(self, weights: List[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding
+        self.n = n
+        self.prob = prob
+        self.alias = alias
+        self._np = None
+
+    def sample(self, rng) -> int:
+        u = rng.random() * self.n
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def sample_n(self, count: int, rng) -> List[int]:
+        n, prob, alias, rand = self.n, self.prob, self.alias, rng.random
+        out = []
+        append = out.append
+        for _ in range(count):
+            u = rand() * n
+            i = int(u)
+            append(i if u - i < prob[i] else alias[i])
+        return out
+
+    def sample_array(self, count: int, generator):
+        # NumPy path: the same draw, vectorized over `count` uniforms
+        if self._np is None:
+            self._np = (numpy.asarray(self.prob), numpy.asarray(self.alias, dtype=numpy.intp))
+        prob, alias = self._np
+        u = generator.random(count) * self.n
+        i = u.astype(numpy.intp)
+        return numpy.where(u - i < prob[i], i, alias[i])
+
+
+class LootEngine:
+    """
+    Precompiled loot roller: alias tables plus a cache of item bases per (rarity, type, affix, class).
+    """
+    def __init__(self, rarities=None, item_types=None, affixes=None, affix_from: str = 'Magic'):
+        self.rarities = [r['name'] for r in (rarities or LOOT_RARITIES)]
+        self.item_types = [t['name'] for t in (item_types or LOOT_ITEM_TYPES)]
+        affixes = LOOT_AFFIXES if affixes is None else affixes
+        self.affixes = [a['name'] for a in affixes]
+        self.affix_stats = [a['stat'] for a in affixes]
+        self.rarity_table = AliasTable([r['weight'] for r in (rarities or LOOT_RARITIES)])
+        self.type_table = AliasTable([t['weight'] for t in (item_types or LOOT_ITEM_TYPES)])
+        self.affix_table = AliasTable([a['weight'] for a in affixes]) if affixes else None
+        # Rarity index from which drops carry an affix
+        self.affix_from = self.rarities.index(affix_from) if affix_from in self.rarities else len(self.rarities)
+        self._item_base = item_model.ItemBase
+        self._from_base = item_model.item_from_base
+        self._bases = {}
+
+    def _base(self, rarity: int, item_type: int, affix: int, char_class: str):
+        key = (rarity, item_type, affix, char_class)
+        base = self._bases.get(key)
+        if base is None:
+            rarity_name, type_name = self.rarities[rarity], self.item_types[item_type]
+            name = f"{rarity_name} {type_name} of {char_class}"
+            stat_keys = ('Power',)
+            if affix >= 0:
+                name = f"{self.affixes[affix]} {name}"
+                stat_keys = ('Power', self.affix_stats[affix])
+            base = self._bases[key] = self._item_base.intern(name, type_name, rarity_name, (1, 1), stat_keys)
+        return base
+
+    def roll_arrays(self, n: int, rng=None):
+        """Raw (rarity, type, affix, power, affix_value) rolls for balancing runs, without building items."""
+        # affix is -1 where the rarity carries none; NumPy arrays for a numpy Generator, lists otherwise
+        rng = rng or rng_system.stream('loot')
+        lo, hi = POWER_RANGE
+        alo, ahi = AFFIX_RANGE
+        if _is_numpy_rng(rng):
+            rarity = self.rarity_table.sample_array(n, rng)
+            item_type = self.type_table.sample_array(n, rng)
+            if self.affix_table is not None:
+                affix = numpy.where(rarity >= self.affix_from, self.affix_table.sample_array(n, rng), -1)
+            else:
+                affix = numpy.full(n, -1)
+            power = rng.integers(lo, hi + 1, n)
+            affix_value = numpy.where(affix >= 0, rng.integers(alo, ahi + 1, n), 0)
+            return rarity, item_type, affix, power, affix_value
+        rand = rng.random
+        rarity = self.rarity_table.sample_n(n, rng)
+        item_type = self.type_table.sample_n(n, rng)
+        power = [lo + int(rand() * (hi - lo + 1)) for _ in range(n)]
+        affix, affix_value = [-1] * n, [0] * n
+        if self.affix_table is not None:
+            table, start = self.affix_table, self.affix_from
+            for k, r in enumerate(rarity):
+                if r >= start:
+                    affix[k] = table.sample(rng)
+                    affix_value[k] = alo + int(rand() * (ahi - alo + 1))
+        return rarity, item_type, affix, power, affix_value
+
+    def generate_batch(self, n: int, char_class: str, rng=None) -> list:
+        # n drops for one character class; rng is a random.Random, a numpy Generator, or None for
+        # the shared 'loot' stream
+        rarity, item_type, affix, power, affix_value = self.roll_arrays(n, rng)
+        if _is_numpy_rng(rng):
+            rarity, item_type, affix = rarity.tolist(), item_type.tolist(), affix.tolist()
+            power, affix_value = power.tolist(), affix_value.tolist()
+        base, from_base = self._base, self._from_base
+        drops = []
+        for r, t, a, p, v in zip(rarity, item_type, affix, power, affix_value):
+            drops.append(from_base(base(r, t, a, char_class), (p,) if a < 0 else (p, v)))
+        return drops
+
+    def roll(self, char_class: str, rng=None):
+        # One drop; same draw order as generate_batch(1, ...) without building the batch lists
+        rng = rng or rng_system.stream('loot')
+        if _is_numpy_rng(rng):
+            return self.generate_batch(1, char_class, rng)[0]
+        rand = rng.random
+        rarity = self.rarity_table.sample(rng)
+        item_type = self.type_table.sample(rng)
+        lo, hi = POWER_RANGE
+        rolls = (lo + int(rand() * (hi - lo + 1)),)
+        affix = -1
+        if self.affix_table is not None and rarity >= self.affix_from:
+            affix = self.affix_table.sample(rng)
+            alo, ahi = AFFIX_RANGE
+            rolls += (alo + int(rand() * (ahi - alo + 1)),)
+        return self._from_base(self._base(rarity, item_type, affix, char_class), rolls)
+
+
+class DropTable:
+    """
+    Compiled drops for one (monster, world tier): item bases and an alias table over their rarities.
+    """
+    __slots__ = ('monster_id', 'world_tier', 'drop_chance', 'bases', 'table')
+
+    def __init__(self, monster_id: str, world_tier: int, drop_chance: float, bases: list, weights: List[float]):
+        self.monster_id = monster_id
+        self.world_tier = world_tier
+        self.drop_chance = drop_chance
+        self.bases = bases
+        self.table = AliasTable(weights)
+
+    def roll(self, rng=None):
+        # The kill's drop, or None
+        rng = rng or rng_system.stream('loot')
+        if rng.random() >= self.drop_chance:
+            return None
+        return item_model.item_from_base(self.bases[self.table.sample(rng)])
+
+    def roll_indices(self, n: int, rng=None) -> List[int]:
+        # For balancing runs: entry index per kill, -1 for no drop
+        rng = rng or rng_system.stream('loot')
+        chance, rand, sample = self.drop_chance, rng.random, self.table.sample
+        return [sample(rng) if rand() < chance else -1 for _ in range(n)]
+
+
+def compile_drop_table(monster_id: str, world_tier: int = 1) -> Optional[DropTable]:
+    # None when the monster's loot_table is empty or names no known item; ValueError for a bad tier
+    game_assets.check_world_tier(world_tier)
+    monster = game_assets.MONSTERS[monster_id]
+    rarity_rank = {r['name'].lower(): (rank, r['weight']) for rank, r in enumerate(LOOT_RARITIES)}
+    tier_bonus = 1.0 + TIER_RARITY_BONUS * (world_tier - 1)
+    bases, weights = [], []
+    for item_id in monster.get('loot_table', []):
+        if item_id not in game_assets.ITEMS:
+            continue
+        rarity = str(game_assets.ITEMS[item_id].get('rarity', 'common')).lower()
+        rank, weight = rarity_rank.get(ASSET_RARITY_ALIASES.get(rarity, rarity).lower(), rarity_rank['common'])
+        bases.append(item_model.ItemBase.get(item_id))
+        weights.append(weight * tier_bonus ** rank)
+    if not bases:
+        return None
+    chance = monster.get('drop_chance', BASE_DROP_CHANCE) * (1.0 + TIER_DROP_BONUS * (world_tier - 1))
+    return DropTable(monster_id, world_tier, min(1.0, chance), bases, weights)
+
+
+_drop_tables = {}
+_drop_tables_version = None
+
+
+def drop_table(monster_id: str, world_tier: int = 1) -> Optional[DropTable]:
+    # Cached per (monster, world tier); everything is rebuilt after game_assets changes
+    global _drop_tables_version
+    if _drop_tables_version != game_assets.ASSET_VERSION:
+        invalidate_drop_tables()
+        _drop_tables_version = game_assets.ASSET_VERSION
+    key = (monster_id, world_tier)
+    try:
+        return _drop_tables[key]
+    except KeyError:
+        table = _drop_tables[key] = compile_drop_table(monster_id, world_tier)
+        return table
+
+
+def invalidate_drop_tables():
+    _drop_tables.clear()
+    item_model.ItemBase.clear_asset_cache()
+
+
+def roll_kill(monster_id: str, world_tier: int = 1, rng=None):
+    table = drop_table(monster_id, world_tier)
+    return table.roll(rng) if table is not None else None
+
+
+_default_engine: Optional[LootEngine] = None
+
+
+def default_engine() -> LootEngine:
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = LootEngine()
+    return _default_engine
+
+
+# Example usage / drop-rate benchmark
+if __name__ == "__main__":
+    engine = default_engine()
+    n = 1_000_000
+    rng = random.Random(1)
+    start = time.perf_counter()
+    rarity = engine.roll_arrays(n, rng)[0]
+    elapsed = time.perf_counter() - start
+    counts = [rarity.count(i) for i in range(len(engine.rarities))]
+    print(f"Python rolls: {n} in {elapsed:.2f}s")
+    for name, count in zip(engine.rarities, counts):
+        print(f"  {name:10} {count / n:.4f}")
+    start = time.perf_counter()
+    for _ in range(100_000):
+        engine.roll('Rogue', rng)
+    print(f"Single drops: {(time.perf_counter() - start) * 10:.2f}us per drop")
+    start = time.perf_counter()
+    drops = engine.generate_batch(100_000, 'Rogue', rng)
+    print(f"Python items: {len(drops)} in {time.perf_counter() - start:.2f}s, e.g. {drops[0]}")
+    if numpy is not None:
+        generator = numpy.random.default_rng(1)
+        n = 20_000_000
+        start = time.perf_counter()
+        rarity = engine.roll_arrays(n, generator)[0]
+        elapsed = time.perf_counter() - start
+        print(f"NumPy rolls: {n} in {elapsed:.2f}s, rarity shares {numpy.bincount(rarity) / n}")
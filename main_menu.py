@@ -1,12 +1,15 @@
 import random
 import time
-import os
-import pickle
-import sys
-import importlib.util
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import simpledialog
+from patch_system import DebugLog
+from save_system import (AutosaveService, CharacterSaveFile, GameJournal, StateSnapshot, apply_mutation,
+                         load_game_file, state_section)
+from stash_system import Stash
+import loot_system
+from combat_system import CombatEngine, CombatSystem, monster_enemy
+import rng_system
 
 # Import referenced subsystems (if available)
 try:
@@ -30,6 +33,9 @@ try:
 except ImportError:
     settings_system = None
 
+# XP per monster level for a kill, for monsters without their own 'xp' entry
+KILL_XP_PER_LEVEL = 10
+
 # === CRAFTING SYSTEM (Last Epoch & Diablo 4 inspired) ===
 class CraftingSystem:
     def __init__(self):
@@ -65,9 +71,9 @@ class CraftingSystem:
         for mat, amt in recipe['materials'].items():
             self.materials[mat] -= amt
         # Add random affixes (prefix and suffix)
-        import random
-        prefix = random.choice(GEAR_PREFIXES)
-        suffix = random.choice(GEAR_SUFFIXES)
+        rng = rng_system.stream('crafting')
+        prefix = rng.choice(GEAR_PREFIXES)
+        suffix = rng.choice(GEAR_SUFFIXES)
         crafted_item = {
             'name': f"{prefix['name']} {recipe['base_item']} {suffix['name']}",
             'type': next((l['type'] for l in LOOT_TABLE if l['item'] == recipe['base_item']), 'Unknown'),
@@ -86,81 +92,18 @@ class CraftingSystem:
     def get_recipes(self):
         return [r['name'] for r in self.crafting_recipes]
 
-class CombatSystem:
-    def __init__(self, player, enemy):
-        self.player = player
-        self.enemy = enemy
-        self.turn = 'player'  # or 'enemy'
-        self.log = []
-        self.player_hp = player.get('stats', {}).get('hp', 100)
-        self.enemy_hp = enemy.get('hp', 50)
-        self.player_max_hp = player.get('stats', {}).get('max_hp', 100)
-        self.enemy_max_hp = enemy.get('hp', 50)
-        self.player_mana = player.get('stats', {}).get('mana', 50)
-        self.player_max_mana = player.get('stats', {}).get('max_mana', 50)
-        self.status = {'player': [], 'enemy': []}
-        self.result = None
-
-    def player_attack(self):
-        base = self.player.get('stats', {}).get('attack', 10)
-        speed = self.player.get('stats', {}).get('attack_speed', 1.0)
-        crit = self.player.get('stats', {}).get('crit_chance', 0.05)
-        crit_mult = self.player.get('stats', {}).get('crit_mult', 2.0)
-        dmg = DPSCalculator.calculate(base, speed, crit, crit_mult)
-        dmg = int(dmg * random.uniform(0.8, 1.2))
-        self.enemy_hp -= dmg
-        self.log.append(f"Player attacks for {dmg} damage!")
-        if self.enemy_hp <= 0:
-            self.enemy_hp = 0
-            self.result = 'win'
-            self.log.append("Enemy defeated!")
-        self.turn = 'enemy'
-
-    def enemy_attack(self):
-        base = self.enemy.get('attack', 8)
-        speed = self.enemy.get('attack_speed', 1.0)
-        crit = self.enemy.get('crit_chance', 0.05)
-        crit_mult = self.enemy.get('crit_mult', 1.5)
-        dmg = DPSCalculator.calculate(base, speed, crit, crit_mult)
-        dmg = int(dmg * random.uniform(0.8, 1.2))
-        self.player_hp -= dmg
-        self.log.append(f"Enemy attacks for {dmg} damage!")
-        if self.player_hp <= 0:
-            self.player_hp = 0
-            self.result = 'lose'
-            self.log.append("You have been defeated!")
-        self.turn = 'player'
-
-    def use_skill(self, skill):
-        # Example: skills cost mana, deal extra damage
-        cost = skill.get('mana_cost', 10)
-        if self.player_mana < cost:
-            self.log.append("Not enough mana!")
-            return
-        self.player_mana -= cost
-        base = self.player.get('stats', {}).get('attack', 10) + skill.get('power', 10)
-        dmg = int(base * random.uniform(1.1, 1.5))
-        self.enemy_hp -= dmg
-        self.log.append(f"Player uses {skill['name']} for {dmg} damage!")
-        if self.enemy_hp <= 0:
-            self.enemy_hp = 0
-            self.result = 'win'
-            self.log.append("Enemy defeated!")
-        self.turn = 'enemy'
-
-    def is_over(self):
-        return self.result is not None
-
-    def get_log(self):
-        return '\n'.join(self.log[-6:])
-
 class CombatSystemGUI:
-    def __init__(self, root, player, enemy):
+    def __init__(self, root, player, enemy, on_victory=None):
         self.root = tk.Toplevel(root)
         self.root.title("Combat Encounter")
         self.combat = CombatSystem(player, enemy)
+        self.on_victory = on_victory  # called once when the enemy falls
+        # The engine owns pacing; the window just advances it on a timer and reacts to its events
+        self.engine = CombatEngine(self.combat)
+        self.engine.subscribe(self._on_event)
         self._draw_ui()
         self._update_ui()
+        self.root.after(self.engine.tick_ms, self._tick)
 
     def _draw_ui(self):
         self.info = tk.Label(self.root, text="", font=("Arial", 12, "bold"))
@@ -182,6 +125,18 @@ class CombatSystemGUI:
         self.close_btn = tk.Button(self.root, text="Close", command=self.root.destroy)
         self.close_btn.pack(pady=5)
 
+    def _tick(self):
+        if not self.root.winfo_exists():
+            return
+        self.engine.tick()
+        if not self.combat.is_over():
+            self.root.after(self.engine.tick_ms, self._tick)
+
+    def _on_event(self, event):
+        if event.actor == 'enemy' and event.action == 'defeated' and self.on_victory is not None:
+            self.on_victory()
+        self._update_ui()
+
     def _update_ui(self):
         c = self.combat
         self.info.config(text=f"Player HP: {c.player_hp}/{c.player_max_hp} | Mana: {c.player_mana}/{c.player_max_mana}\nEnemy HP: {c.enemy_hp}/{c.enemy_max_hp}")
@@ -196,19 +151,14 @@ class CombatSystemGUI:
                 self.info.config(text="Victory! You defeated the enemy.")
             else:
                 self.info.config(text="Defeat! You have fallen.")
-        elif c.turn == 'player':
-            self.attack_btn.config(state='normal')
-            self.skill_btn.config(state='normal')
-            self.end_btn.config(state='normal')
         else:
-            self.attack_btn.config(state='disabled')
-            self.skill_btn.config(state='disabled')
-            self.end_btn.config(state='disabled')
-            self.root.after(1200, self._enemy_turn)
+            state = 'normal' if self.engine.player_ready else 'disabled'
+            self.attack_btn.config(state=state)
+            self.skill_btn.config(state=state)
+            self.end_btn.config(state=state)
 
     def _attack(self):
-        self.combat.player_attack()
-        self._update_ui()
+        self.engine.queue('attack')
 
     def _use_skill(self):
         # Use first available skill for demo
@@ -220,19 +170,14 @@ class CombatSystemGUI:
             # Remove type restriction: ensure skill dict can accept int for 'power' and 'mana_cost'
             # If skill dict is type-restricted, use a new dict for combat logic
             skill = dict(skill)
-            self.combat.use_skill(skill)
+            self.engine.queue('skill', skill)
         else:
-            self.combat.log.append("No skills available!")
-        self._update_ui()
+            self.combat.log.append("No skills available!", self.combat.tick)
+            self._update_ui()
 
     def _end_turn(self):
-        self.combat.turn = 'enemy'
-        self._update_ui()
-
-    def _enemy_turn(self):
-        if not self.combat.is_over():
-            self.combat.enemy_attack()
-            self._update_ui()
+        # Let the action timer run out without acting
+        self.engine.queue('wait')
 
 class SocialSystem:
     def __init__(self):
@@ -555,6 +500,17 @@ class MainMenuGUI:
         self.party_finder = PartyFinderSystem(self.party_system, self.dungeon_system)
         self.dungeon_finder = DungeonFinderSystem(self.party_system, self.dungeon_system, self.instance_base_system)
         self.teleport_system = None  # Will be set after world creation
+        self.character_save = CharacterSaveFile('characters.d4save')
+        self.character_slot = None  # Save slot of the current character
+        self.autosave = AutosaveService('autosave.d4save')
+        # Write-ahead journal of small state changes; replayed on startup for Continue
+        self.journal = GameJournal('game.journal', 'game.checkpoint', background=self.autosave.run)
+        self._checkpoint_retry = False
+        try:
+            self._recovered_state = self.journal.recover()
+        except Exception as e:
+            DebugLog.log(f"Journal recovery failed: {e}")
+            self._recovered_state = None
         self.show_loading_screen()
         self.create_menu()
 
@@ -593,7 +549,7 @@ class MainMenuGUI:
         tk.Button(frame, text="Social System", width=30, command=self.launch_social).pack(pady=5)
         tk.Button(frame, text="Settings", width=30, command=self.launch_settings).pack(pady=5)
         tk.Button(frame, text="Game Credits", width=30, command=self.show_credits).pack(pady=5)
-        tk.Button(frame, text="Exit", width=30, command=self.root.quit).pack(pady=20)
+        tk.Button(frame, text="Exit", width=30, command=self.exit_game).pack(pady=20)
         tk.Button(frame, text="Help / Tutorial", command=lambda: show_help_window(self.root)).pack(pady=3)
         tk.Button(frame, text="Season Mode", command=self.show_season_window).pack(pady=3)
         tk.Button(frame, text="Pit of Artificers", command=self.show_pit_window).pack(pady=3)
@@ -624,30 +580,118 @@ class MainMenuGUI:
             'season_number': 0,
             'paragon_points_earned': 0
         }
-        # Generate a random seed for the game engine
+        # Generate a random seed for the game engine; subsystems draw from streams derived from it
         self.seed = int(time.time() * 1000) ^ random.randint(0, 2**32-1)
-        random.seed(self.seed)
+        rng_system.reseed(self.seed)
         # Character creation dialog
         self.create_character_dialog()
 
     def load_character_list(self):
-        # Load up to 12 characters from a save file
+        # Load up to 12 characters from the slotted save file
         try:
-            if os.path.exists('characters.d4save'):
-                with open('characters.d4save', 'rb') as f:
-                    char_list = pickle.load(f)
-                return char_list[:12]
+            return self.character_save.load_all()
         except Exception as e:
             messagebox.showerror("Load Error", f"Failed to load character list: {e}")
         return []
 
     def save_character_list(self, char_list):
+        # Full rewrite of every slot; prefer save_character for single updates
         try:
-            with open('characters.d4save', 'wb') as f:
-                pickle.dump(char_list, f)
+            self.character_save.save_all(char_list)
         except Exception as e:
             messagebox.showerror("Save Error", f"Failed to save character list: {e}")
 
+    def save_character(self, character, slot=None):
+        # Rewrite only the given character's slot record, on the autosave worker
+        slot = self.character_slot if slot is None else slot
+        if slot is None:
+            return
+        summary = {k: character[k] for k in ('name', 'class', 'level', 'hardcore') if k in character}
+        self.autosave.submit(('slot', slot), StateSnapshot({'character': character}),
+                             lambda snap, slot=slot: self.character_save.save_slot(
+                                 slot, summary, snap.sections()['character']))
+
+    def _game_state(self):
+        return {
+            'character': self.character,
+            'character_slot': self.character_slot,
+            'game_world': getattr(self, 'game_world', None),
+            'game_stats': getattr(self, 'game_stats', None),
+            'seed': getattr(self, 'seed', None),
+        }
+
+    def _restore_game_state(self, game_state):
+        self.character = game_state.get('character')
+        self.character_slot = game_state.get('character_slot')
+        if game_state.get('game_stats') is not None:
+            self.game_stats = game_state['game_stats']
+        if game_state.get('seed') is not None:
+            self.seed = game_state['seed']
+        if game_state.get('game_world'):
+            self.game_world = game_state['game_world']
+            if isinstance(self.game_world.get('bank'), dict):
+                self.game_world['bank'] = Stash.from_legacy(self.game_world['bank'])
+            self.world_map = self.game_world.get('world_map', {})
+            self.world_seed = self.game_world.get('world_seed')
+            self.teleport_system = TeleportSystem(self.world_map)
+        seed = self.world_seed if getattr(self, 'world_seed', None) is not None else game_state.get('seed')
+        if seed is not None:
+            rng_system.reseed(seed)
+
+    def record_event(self, op, path, value=None):
+        # Apply a small state change (XP, loot, zone, quest, stat) and journal it
+        state = self._game_state()
+        if state.get(path[0]) is None:
+            return
+        # Queued saves still reading this section pickle it before it changes
+        self.autosave.before_change(state_section(path))
+        apply_mutation(state, op, path, value)
+        try:
+            self.journal.append(op, path, value)
+        except Exception as e:
+            DebugLog.log(f"Journal append failed: {e}")
+        if path[0] == 'character':
+            # XP, loot and quest changes: keep the slot record (Character Select, load_slot) in step
+            self.save_character(self.character)
+        if self.journal.needs_checkpoint():
+            self.checkpoint_game()
+
+    def checkpoint_game(self):
+        # Compact the journal into a full checkpoint written by the autosave worker
+        seq = self.journal.begin_checkpoint()
+        if seq is None:
+            # Previous checkpoint still being written; retry shortly
+            if not self._checkpoint_retry:
+                self._checkpoint_retry = True
+                self.root.after(250, self._retry_checkpoint)
+            return
+        try:
+            self.autosave.submit('checkpoint', StateSnapshot(self._game_state()),
+                                 lambda snap, seq=seq: self.journal.write_checkpoint(snap, seq))
+        except Exception as e:
+            # Not queued: release the checkpoint so the next attempt can start one
+            self.journal.abort_checkpoint()
+            DebugLog.log(f"Checkpoint not queued: {e}")
+
+    def _retry_checkpoint(self):
+        self._checkpoint_retry = False
+        self.checkpoint_game()
+
+    def request_autosave(self):
+        # Whole-state changes (new world, character switch) get a checkpoint; small ones use record_event
+        if self.character is None:
+            return
+        self.checkpoint_game()
+        self.save_character(self.character)
+
+    def exit_game(self):
+        self.request_autosave()
+        if not self.autosave.flush(timeout=5.0):
+            DebugLog.log("Autosave did not finish before exit.")
+        self.autosave.close()
+        self.journal.close()
+        self.root.quit()
+
     def create_character_dialog(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("Create New Character")
@@ -682,12 +726,17 @@ class MainMenuGUI:
                 'quests': [],
                 'hardcore': is_hardcore
             }
-            char_list = self.load_character_list()
-            if len(char_list) < 12:
-                char_list.append(new_char)
-                self.save_character_list(char_list)
+            try:
+                # Reserved so the next free-slot lookup skips it; the record is written by the autosave worker
+                slot = self.character_save.reserve_slot()
+            except Exception as e:
+                messagebox.showerror("Load Error", f"Failed to load character list: {e}")
+                return
+            if slot is not None:
                 self.character = new_char
-                self.game_stats['characters_created'] += 1
+                self.character_slot = slot
+                self.request_autosave()
+                self.record_event('add', ('game_stats', 'characters_created'), 1)
                 dialog.destroy()
                 self.start_campaign_story()
             else:
@@ -711,6 +760,10 @@ class MainMenuGUI:
 
     def continue_game(self):
         # Continue logic for resuming last character and campaign
+        if (not hasattr(self, 'character') or self.character is None) and self._recovered_state:
+            # Checkpoint plus journal tail, replayed at startup
+            self._restore_game_state(self._recovered_state)
+            self._recovered_state = None
         if not hasattr(self, 'character') or self.character is None:
             messagebox.showinfo("Continue", "No saved character found. Please start a new game.")
             return
@@ -770,7 +823,7 @@ class MainMenuGUI:
         # Create a new game world after new game
         # Generate a world seed for reproducibility
         self.world_seed = int(time.time() * 1000) ^ random.randint(0, 2**32-1)
-        random.seed(self.world_seed)
+        rng_system.reseed(self.world_seed)
         # Define a grid-based world map (10x10 for example)
         self.world_map = {}
         # Expanded world geography: continents, countries, kingdoms, zones
@@ -826,7 +879,7 @@ class MainMenuGUI:
             'events': [],
             'npcs': ['Blacksmith', 'Alchemist', 'Banker', 'Tree of Whispers'],
             'vendors': ['General Goods', 'Jeweler', 'Purveyor of Curiosities'],
-            'bank': {'slots': 20, 'items': []},
+            'bank': Stash(),
             'tree_of_whispers': {'grim_favors': 0, 'rewards': []},
             'world_seed': self.world_seed,
             'world_map': self.world_map,
@@ -837,15 +890,21 @@ class MainMenuGUI:
             'zones': [z['name'] for z in zones],
         }
         self.teleport_system = TeleportSystem(self.world_map)
+        self.request_autosave()
 
     def load_game(self):
         from tkinter import filedialog
         file_path = filedialog.askopenfilename(title="Load Game", filetypes=[("Save Files", "*.d4save")])
         if file_path:
             try:
-                with open(file_path, "rb") as f:
-                    game_state = pickle.load(f)
-                messagebox.showinfo("Load Game", f"Game loaded from {file_path}\n(Implement state restore)")
+                game_state, damaged = load_game_file(file_path)
+                self._restore_game_state(game_state)
+                self.request_autosave()
+                if damaged:
+                    DebugLog.log(f"Save {file_path} sections lost to corruption: {', '.join(damaged)}")
+                    messagebox.showwarning("Load Game", f"Game loaded from {file_path}\nDamaged sections were skipped: {', '.join(damaged)}")
+                else:
+                    messagebox.showinfo("Load Game", f"Game loaded from {file_path}")
             except Exception as e:
                 messagebox.showerror("Load Error", f"Failed to load: {e}")
 
@@ -854,10 +913,9 @@ class MainMenuGUI:
         file_path = filedialog.asksaveasfilename(title="Save Game", defaultextension=".d4save", filetypes=[("Save Files", "*.d4save")])
         if file_path:
             try:
-                game_state = {}  # Replace with actual game state
-                with open(file_path, "wb") as f:
-                    pickle.dump(game_state, f)
-                messagebox.showinfo("Save Game", f"Game saved to {file_path}")
+                # Serialization and disk I/O run on the autosave worker, not the Tk thread
+                self.autosave.request(self._game_state(), path=file_path)
+                messagebox.showinfo("Save Game", f"Saving game to {file_path}")
             except Exception as e:
                 messagebox.showerror("Save Error", f"Failed to save: {e}")
 
@@ -870,21 +928,19 @@ class MainMenuGUI:
             messagebox.showerror("Error", "Character system module not found or incomplete.")
 
     def launch_inventory(self):
-        mod_name = 'inventory'
-        mod_path = 'inventory.py'
         try:
-            spec = importlib.util.spec_from_file_location(mod_name, mod_path)
-            if spec and spec.loader:
-                inv_mod = importlib.util.module_from_spec(spec)
-                sys.modules[mod_name] = inv_mod
-                spec.loader.exec_module(inv_mod)
-                inv = inv_mod.Inventory()
-                inv.add_item(inv_mod.Item("Sword of Doom", "Weapon", "Legendary", {"Damage": 100}, (2,1)))
-                inv.add_item(inv_mod.Item("Iron Helm", "Armor", "Rare", {"Armor": 20}, (2,2)))
-                inv.add_item(inv_mod.Item("Health Potion", "Potion", "Common", {"Heal": 50}, (1,1)))
-                inv_mod.InventoryGUI(inv).run()
-            else:
-                messagebox.showerror("Error", "Could not load Inventory module.")
+            import item_model
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load Inventory module: {e}")
+            return
+        try:
+            inv = item_model.Inventory()
+            inv.add_items([
+                item_model.Item("Sword of Doom", "Weapon", "Legendary", {"Damage": 100}, (2,1)),
+                item_model.Item("Iron Helm", "Armor", "Rare", {"Armor": 20}, (2,2)),
+                item_model.Item("Health Potion", "Potion", "Common", {"Heal": 50}, (1,1)),
+            ])
+            item_model.InventoryGUI(inv).run()
         except Exception as e:
             messagebox.showerror("Error", f"Inventory system error: {e}")
 
@@ -896,7 +952,14 @@ class MainMenuGUI:
 
     def launch_quests(self):
         if quests_system:
-            quests_system.QuestsSystemGUI(quests_system.QuestsSystem()).run()
+            if self.character is not None:
+                # The character's own quest list; adds and removals are journaled
+                quests = quests_system.QuestsSystem(
+                    self.character.setdefault('quests', []),
+                    record=lambda op, quest: self.record_event(op, ('character', 'quests'), quest))
+            else:
+                quests = quests_system.QuestsSystem()
+            quests_system.QuestsSystemGUI(quests).run()
         else:
             messagebox.showerror("Error", "Quests system module not found.")
 
@@ -963,8 +1026,8 @@ class MainMenuGUI:
         # Advanced: allow travel to towns/cities/kingdoms
         def travel_to_location(loc):
             if loc['type'] in ['Town', 'City', 'Kingdom']:
-                self.game_world['zone'] = loc['name']
-                self.game_world['zone_coords'] = (loc['x'], loc['y'])
+                self.record_event('set', ('game_world', 'zone'), loc['name'])
+                self.record_event('set', ('game_world', 'zone_coords'), (loc['x'], loc['y']))
                 messagebox.showinfo("Travel", f"You have traveled to {loc['name']}!")
                 map_win.destroy()
         def on_right_click(event):
@@ -1046,9 +1109,32 @@ class MainMenuGUI:
             tk.Button(actions_frame, text=skill_name, width=18, command=lambda s=skill: messagebox.showinfo("Skill", f"You use {s['name']}!" if isinstance(s, dict) and 'name' in s else f"You use {s}"), bg="#222", fg="#fff").grid(row=0, column=i, padx=3, pady=2)
         # Basic Attack
         tk.Button(actions_frame, text="Basic Attack", width=18, command=lambda: messagebox.showinfo("Attack", "You attack the enemy!"), bg="#444", fg="#fff").grid(row=1, column=0, padx=3, pady=2)
+        if self.character:
+            tk.Button(actions_frame, text="Fight a Monster", width=18, command=self.start_fight, bg="#444", fg="#fff").grid(row=1, column=1, padx=3, pady=2)
         # Close button
         tk.Button(combat, text="Close", command=combat.destroy).pack(pady=10)
 
+    def start_fight(self, monster_id=None):
+        # Real-time fight against a game_assets monster; a win is journaled by _on_victory
+        if not self.character:
+            messagebox.showerror("Error", "No character loaded.")
+            return
+        import game_assets
+        monster_id = monster_id or rng_system.stream('combat').choice(sorted(game_assets.MONSTERS))
+        CombatSystemGUI(self.root, self.character, monster_enemy(monster_id),
+                        on_victory=lambda: self._on_victory(monster_id))
+
+    def _on_victory(self, monster_id):
+        # Kill count, XP and the kill's drop all go through the journal
+        import game_assets
+        monster = game_assets.MONSTERS[monster_id]
+        world_tier = (getattr(self, 'game_world', None) or {}).get('world_tier', 1)
+        self.record_event('add', ('game_stats', 'monsters_defeated'), 1)
+        self.record_event('add', ('character', 'xp'), monster.get('xp', KILL_XP_PER_LEVEL * monster.get('level', 1)))
+        drop = loot_system.roll_kill(monster_id, world_tier)
+        if drop is not None:
+            self.record_event('append', ('character', 'inventory'), drop)
+
     def launch_crafting_menu(self):
         crafting = tk.Toplevel(self.root)
         crafting.title("Crafting Menu")
@@ -1124,15 +1210,32 @@ class MainMenuGUI:
         tk.Button(win, text="Close", command=win.destroy).pack(pady=8)
 
     def launch_character_select(self):
-        char_list = self.load_character_list()
-        if not char_list:
+        # Only the slot summaries are read here; _select_character_slot loads the full character
+        try:
+            summaries = self.character_save.list_summaries()
+        except Exception as e:
+            messagebox.showerror("Load Error", f"Failed to load character list: {e}")
+            return
+        if not summaries:
             messagebox.showinfo("Character Select", "No saved characters found. Create a new character first.")
             return
-        CharacterSelectGUI(self.root, char_list, self._set_active_character)
+        CharacterSelectGUI(self.root, summaries, self._select_character_slot)
+
+    def _select_character_slot(self, summary):
+        try:
+            character = self.character_save.load_slot(summary['slot'])
+        except Exception as e:
+            messagebox.showerror("Load Error", f"Failed to load character: {e}")
+            return
+        if character is None:
+            messagebox.showerror("Load Error", f"Slot {summary['slot'] + 1} is empty.")
+            return
+        self._set_active_character(character, summary['slot'])
 
-    def _set_active_character(self, character):
+    def _set_active_character(self, character, slot=None):
         self.character = character
-        # Optionally save the last selected character index
+        self.character_slot = slot
+        self.request_autosave()
         messagebox.showinfo("Character Selected", f"You selected: {character['name']}")
 
     def launch_raids(self):
@@ -1243,9 +1346,11 @@ class MainMenuGUI:
 # Character selection GUI
 class CharacterSelectGUI:
     def __init__(self, root, character_list, on_select):
+        # character_list holds slot summaries (see CharacterSaveFile.list_summaries)
         self.root = tk.Toplevel(root)
         self.root.title("Select Your Character")
         self.character_list = character_list
+        self.slots = {c['slot']: c for c in character_list}
         self.on_select = on_select
         self.selected_idx = None
         self.buttons = []
@@ -1256,8 +1361,12 @@ class CharacterSelectGUI:
         frame = tk.Frame(self.root)
         frame.pack(padx=10, pady=10)
         for i in range(12):
-            char = self.character_list[i] if i < len(self.character_list) else None
-            btn_text = char['name'] if char else f"Empty Slot {i+1}"
+            char = self.slots.get(i)
+            if char:
+                mode = " (HC)" if char.get('hardcore') else ""
+                btn_text = f"{char['name']}\n{char['class']} Lv{char['level']}{mode}"
+            else:
+                btn_text = f"Empty Slot {i+1}"
             btn = tk.Button(frame, text=btn_text, width=18, height=2,
                             command=lambda idx=i: self._select(idx))
             btn.grid(row=i//4, column=i%4, padx=5, pady=5)
@@ -1267,8 +1376,8 @@ class CharacterSelectGUI:
         for i, btn in enumerate(self.buttons):
             btn.config(relief=tk.SUNKEN if i == idx else tk.RAISED)
     def _confirm(self):
-        if self.selected_idx is not None and self.selected_idx < len(self.character_list):
-            self.on_select(self.character_list[self.selected_idx])
+        if self.selected_idx in self.slots:
+            self.on_select(self.slots[self.selected_idx])
             self.root.destroy()
         else:
             messagebox.showinfo("Select Character", "Please select a valid character slot.")
@@ -1365,11 +1474,12 @@ class SkillTree:
         return f"SkillTree: {[n.name for n in self.nodes if n.unlocked]}"
 
 class PassiveNode:
-    def __init__(self, name: str, effect: str, required_points: int = 1, unlocked: bool = False):
+    def __init__(self, name: str, effect: str, required_points: int = 1, unlocked: bool = False, stats: dict = None):
         self.name = name
         self.effect = effect
         self.required_points = required_points
         self.unlocked = unlocked
+        self.stats = stats or {}  # Numeric bonuses, e.g. {'Strength': 10}; read by build_optimizer
     def __repr__(self):
         return f"PassiveNode({self.name}, Unlocked: {self.unlocked})"
 
@@ -1417,13 +1527,6 @@ class ParagonSystem:
         return f"Paragon: {self.points}/{self.max_points} ({self.bonuses})"
 
 # DPS Calculation utility
-class DPSCalculator:
-    @staticmethod
-    def calculate(base_damage: int, attack_speed: float, crit_chance: float, crit_mult: float, flat_bonus: int = 0, percent_bonus: float = 0.0):
-        crit = 1 + (crit_chance * (crit_mult - 1))
-        dps = ((base_damage + flat_bonus) * (1 + percent_bonus)) * attack_speed * crit
-        return dps
-
 # === SKILLS AND PASSIVES DATA (Diablo  4 & Last Epoch inspired) ===
 
 # Example skills for each class (expand as needed)
@@ -1574,56 +1677,9 @@ ANIMALS = [
     {'name': 'Hawk', 'type': 'Animal', 'level': 1, 'hp': 6, 'attack': 2},
 ]
 
-# === BASIC ENEMY AI SYSTEM ===
-
-class EnemyAI:
-    STATES = ['idle', 'patrol', 'chase', 'attack', 'flee']
-    def __init__(self, enemy, patrol_points=None):
-        self.enemy = enemy
-        self.state = 'idle'
-        self.patrol_points = patrol_points or []
-        self.current_patrol_index = 0
-        self.position = getattr(enemy, 'position', (0, 0))
-    def update(self, player_pos):
-        # Simple AI: chase if close, patrol otherwise
-        if self._distance_to(player_pos) < 5:
-            self.state = 'chase'
-        elif self.patrol_points:
-            self.state = 'patrol'
-        else:
-            self.state = 'idle'
-    def _distance_to(self, pos):
-        ex, ey = self.position
-        px, py = pos
-        return ((ex - px) ** 2 + (ey - py) ** 2) ** 0.5
-    def _patrol(self):
-        if not self.patrol_points:
-            return
-        self.current_patrol_index = (self.current_patrol_index + 1) % len(self.patrol_points)
-        self.position = self.patrol_points[self.current_patrol_index]
-    def act(self):
-        if self.state == 'patrol':
-            self._patrol()
-        elif self.state == 'chase':
-            # Move towards player (not implemented)
-            pass
-        elif self.state == 'attack':
-            # Attack logic (not implemented)
-            pass
-        elif self.state == 'flee':
-            # Flee logic (not implemented)
-            pass
-        # else idle
-
 # === LOOT RARITIES, CLASSES, TYPES (define before use) ===
-LOOT_RARITIES = [
-    {'name': 'Common', 'color': '#bbb', 'weight': 60},
-   
-    {'name': 'Magic', 'color': '#4b8cff', 'weight': 25},
-    {'name': 'Rare', 'color': '#ffe14b', 'weight': 10},
-    {'name': 'Legendary', 'color': '#ff7f27', 'weight': 4},
-    {'name': 'Unique', 'color': '#b400ff', 'weight': 1},
-]
+# Weights live in loot_system, where the loot engine compiles them
+LOOT_RARITIES = loot_system.LOOT_RARITIES
 
 LOOT_CLASSES = [
     'Barbarian', 'Sorcerer', 'Druid', 'Rogue', 'Necromancer',
@@ -3,14 +3,26 @@ from tkinter import messagebox
 from typing import List, Dict, Optional
 
 class QuestsSystem:
-    def __init__(self):
-        self.quests: List[Dict[str, str]] = []
+    def __init__(self, quests: Optional[List[Dict[str, str]]] = None, record=None):
+        # quests: list managed in place (e.g. a character's); record(op, quest), when given,
+        # makes every change ('append' / 'remove') through the caller, e.g. its journal
+        self.quests: List[Dict[str, str]] = quests if quests is not None else []
+        self.record = record
+
+    def _change(self, op: str, quest: Dict[str, str]):
+        if self.record is not None:
+            self.record(op, quest)
+        elif op == 'append':
+            self.quests.append(quest)
+        else:
+            self.quests.remove(quest)
 
     def add_quest(self, name: str, status: str = "Active"):
-        self.quests.append({"name": name, "status": status})
+        self._change('append', {"name": name, "status": status})
 
     def remove_quest(self, name: str):
-        self.quests = [q for q in self.quests if q["name"] != name]
+        for quest in [q for q in self.quests if q["name"] == name]:
+            self._change('remove', quest)
 
     def list_quests(self) -> List[Dict[str, str]]:
         return self.quests
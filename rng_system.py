@@ -0,0 +1,66 @@
+import hashlib
+import random
+from typing import Dict, Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Seeded random streams. Every subsystem (combat, loot, nemesis, ...) draws from its own
+# generator derived from the world seed, so one subsystem's rolls never shift another's,
+# and a worker process given (seed, name, index) reproduces exactly the same sequence.
+
+
+def derive_seed(root_seed: int, *path) -> int:
+    # Stable 64-bit seed for a stream path; unlike hash(), identical in every process
+    digest = hashlib.blake2b(repr((root_seed,) + path).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class RNGStreams:
+    """
+    Per-subsystem random.Random streams derived from one root seed.
+    """
+    # stream() returns the shared generator for a name; spawn() a fresh one for a per-instance key
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        self._streams: Dict[tuple, random.Random] = {}
+
+    def reseed(self, seed: int):
+        # Existing stream objects are reseeded in place, so holders keep valid references
+        self.seed = seed
+        for key, rng in self._streams.items():
+            rng.seed(derive_seed(seed, *key))
+
+    def stream(self, name: str, *key) -> random.Random:
+        path = (name,) + key
+        rng = self._streams.get(path)
+        if rng is None:
+            rng = self._streams[path] = random.Random(derive_seed(self.seed, *path))
+        return rng
+
+    def spawn(self, name: str, *key) -> random.Random:
+        return random.Random(derive_seed(self.seed, name, *key))
+
+    def numpy_stream(self, name: str, *key):
+        # NumPy Generator for the same path (distinct from the random.Random sequence)
+        if numpy is None:
+            raise RuntimeError("NumPy is not installed")
+        return numpy.random.default_rng(derive_seed(self.seed, name, *key))
+
+
+# Process-wide service; MainMenuGUI reseeds it from the game/world seed
+streams = RNGStreams()
+
+
+def stream(name: str, *key) -> random.Random:
+    return streams.stream(name, *key)
+
+
+def spawn(name: str, *key) -> random.Random:
+    return streams.spawn(name, *key)
+
+
+def reseed(seed: int):
+    streams.reseed(seed)
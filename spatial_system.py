@@ -0,0 +1,169 @@
+import math
+import time
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+# Uniform spatial hash for proximity queries: enemy aggro against a party, AoE skill
+# targeting and loot pickup. Cost per query follows the density around the query point
+# instead of the number of entities in the zone.
+
+# AoE reach, in world units, of skills that hit everything around the caster
+SKILL_RADII = {
+    'Whirlwind': 3.0,
+    'Frost Nova': 5.0,
+}
+PICKUP_RADIUS = 1.5
+
+
+class SpatialHash:
+    """
+    Keyed points bucketed by grid cell; queries only visit cells overlapping the query circle.
+    """
+    __slots__ = ('cell_size', '_cells', '_points')
+
+    def __init__(self, cell_size: float = 4.0):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], set] = {}
+        self._points: Dict[Hashable, list] = {}  # key -> [x, y, cell]
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._points)
+
+    def position(self, key) -> Tuple[float, float]:
+        x, y, _ = self._points[key]
+        return x, y
+
+    def insert(self, key, x: float, y: float):
+        if key in self._points:
+            self.move(key, x, y)
+            return
+        cell = self.cell_of(x, y)
+        self._points[key] = [x, y, cell]
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            bucket = self._cells[cell] = set()
+        bucket.add(key)
+
+    def move(self, key, x: float, y: float):
+        point = self._points[key]
+        point[0], point[1] = x, y
+        cell = self.cell_of(x, y)
+        if cell != point[2]:
+            self._unlink(key, point[2])
+            point[2] = cell
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                bucket = self._cells[cell] = set()
+            bucket.add(key)
+
+    def remove(self, key):
+        point = self._points.pop(key, None)
+        if point is not None:
+            self._unlink(key, point[2])
+
+    def _unlink(self, key, cell):
+        bucket = self._cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self._cells[cell]
+
+    def candidates(self, x: float, y: float, radius: float) -> Iterator[Hashable]:
+        # Keys in every cell the circle's bounding box touches; callers filter by distance
+        cells = self._cells
+        x0, y0 = self.cell_of(x - radius, y - radius)
+        x1, y1 = self.cell_of(x + radius, y + radius)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+            # Query larger than the occupied area: walk the buckets instead of the box
+            for (cx, cy), bucket in cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    yield from bucket
+            return
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def query(self, x: float, y: float, radius: float) -> List[Hashable]:
+        # Keys within radius (inclusive) of (x, y)
+        r2 = radius * radius
+        points = self._points
+        found = []
+        for key in self.candidates(x, y, radius):
+            px, py, _ = points[key]
+            if (px - x) ** 2 + (py - y) ** 2 <= r2:
+                found.append(key)
+        return found
+
+    def nearest(self, x: float, y: float, max_radius: float) -> Optional[Hashable]:
+        # Closest key within max_radius, or None
+        best, best_d2 = None, max_radius * max_radius
+        points = self._points
+        for key in self.candidates(x, y, max_radius):
+            px, py, _ = points[key]
+            d2 = (px - x) ** 2 + (py - y) ** 2
+            if d2 <= best_d2:
+                best, best_d2 = key, d2
+        return best
+
+    def take(self, x: float, y: float, radius: float) -> List[Hashable]:
+        # query() and remove the keys found (loot pickup)
+        found = self.query(x, y, radius)
+        for key in found:
+            self.remove(key)
+        return found
+
+
+def aoe_targets(enemies: SpatialHash, skill: str, x: float, y: float) -> List[Hashable]:
+    # Enemies caught by an AoE skill cast at (x, y); empty for skills without a radius
+    radius = SKILL_RADII.get(skill)
+    return enemies.query(x, y, radius) if radius else []
+
+
+def pick_up(ground: SpatialHash, x: float, y: float, radius: float = PICKUP_RADIUS) -> List[Hashable]:
+    # Items lying within pickup range of (x, y), removed from the ground index
+    return ground.take(x, y, radius)
+
+
+# Example usage / benchmark
+if __name__ == "__main__":
+    import random
+    rng = random.Random(3)
+    n, party_size, size = 10000, 16, 1000.0
+    enemies = SpatialHash(cell_size=5.0)
+    for i in range(n):
+        enemies.insert(i, rng.uniform(0, size), rng.uniform(0, size))
+    party = [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(party_size)]
+    positions = {key: enemies.position(key) for key in enemies}
+
+    start = time.perf_counter()
+    for _ in range(100):
+        near = set()
+        for px, py in party:
+            near.update(enemies.query(px, py, 5.0))
+    grid_ms = (time.perf_counter() - start) / 100 * 1000
+    start = time.perf_counter()
+    for _ in range(5):
+        brute = {key for key, (ex, ey) in positions.items()
+                 if any((ex - px) ** 2 + (ey - py) ** 2 <= 25.0 for px, py in party)}
+    brute_ms = (time.perf_counter() - start) / 5 * 1000
+    assert near == brute
+    print(f"aggro, {n} enemies x {party_size} players: grid {grid_ms:.3f} ms, all pairs {brute_ms:.1f} ms")
+
+    start = time.perf_counter()
+    for key in range(n):
+        x, y = enemies.position(key)
+        enemies.move(key, x + rng.uniform(-0.5, 0.5), y + rng.uniform(-0.5, 0.5))
+    print(f"move all {n}: {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(f"Whirlwind around player 0 hits {len(aoe_targets(enemies, 'Whirlwind', *party[0]))}, "
+          f"Frost Nova {len(aoe_targets(enemies, 'Frost Nova', *party[0]))}")
@@ -0,0 +1,190 @@
+import pickle
+import zlib
+from collections import OrderedDict
+from typing import List, Optional
+
+import item_model
+from patch_system import DebugLog
+
+# Multi-tab stash (bank). Each tab is an Inventory grid stored as its own compressed
+# blob; a tab is only decoded when opened and idle tabs are evicted back to blobs (LRU),
+# so opening the bank never touches items in tabs the player does not look at.
+
+STASH_FORMAT = 2
+TAB_WIDTH = 10
+TAB_HEIGHT = 10
+
+def encode_tab(inventory) -> bytes:
+    # Each distinct item base is written once per tab; items are (base index, rolls, x, y),
+    # plain tuples so tabs don't depend on class pickling
+    bases, base_index, rows = [], {}, []
+    for item in inventory.items:
+        x, y, _, _ = inventory.locate(item)
+        base = item.base
+        index = base_index.get(id(base))
+        if index is None:
+            index = base_index[id(base)] = len(bases)
+            bases.append(base.base_id if base.base_id is not None else base.key)
+        rows.append((index, item.rolls, x, y))
+    return zlib.compress(pickle.dumps((STASH_FORMAT, inventory.width, inventory.height, bases, rows),
+                                      pickle.HIGHEST_PROTOCOL), 1)
+
+
+def decode_tab(blob: bytes):
+    mod = item_model
+    record = pickle.loads(zlib.decompress(blob))
+    inventory = mod.Inventory(record[1], record[2])
+    if record[0] == 1:
+        for name, item_type, rarity, stats, size, x, y in record[3]:
+            inventory._place(mod.Item(name, item_type, rarity, stats, size), x, y)
+        return inventory
+    _, _, _, bases, rows = record
+    bases = [mod.ItemBase.get(b) if isinstance(b, str) else mod.ItemBase.intern(*b) for b in bases]
+    for index, rolls, x, y in rows:
+        inventory._place(mod.Item.from_base(bases[index], rolls), x, y)
+    return inventory
+
+
+class StashTab:
+    """Header for one stash tab; `blob` is None while the tab is empty or open."""
+    __slots__ = ('name', 'blob', 'item_count', 'used_cells')
+
+    def __init__(self, name: str, blob: Optional[bytes] = None, item_count: int = 0, used_cells: int = 0):
+        self.name = name
+        self.blob = blob
+        self.item_count = item_count
+        self.used_cells = used_cells
+
+    def __getstate__(self):
+        return (self.name, self.blob, self.item_count, self.used_cells)
+
+    def __setstate__(self, state):
+        self.name, self.blob, self.item_count, self.used_cells = state
+
+
+class Stash:
+    """
+    Paged bank: tab headers plus at most `max_open` decoded Inventory grids.
+    """
+    # Counts and free space come from the headers, so only the tab in use is ever decoded
+    def __init__(self, tabs: int = 4, width: int = TAB_WIDTH, height: int = TAB_HEIGHT, max_open: int = 2):
+        self.width = width
+        self.height = height
+        self.max_open = max_open
+        self.tabs: List[StashTab] = [StashTab(f"Tab {i + 1}") for i in range(tabs)]
+        self._open: OrderedDict = OrderedDict()  # tab index -> Inventory, least recently used first
+
+    def __getstate__(self):
+        # Saves carry only the per-tab blobs; open grids are encoded without closing them
+        tabs = list(self.tabs)
+        for index, inventory in self._open.items():
+            header = self._header(index)
+            tabs[index] = StashTab(header.name, encode_tab(inventory) if header.item_count else None,
+                                   header.item_count, header.used_cells)
+        return {'format': STASH_FORMAT, 'width': self.width, 'height': self.height,
+                'max_open': self.max_open, 'tabs': tabs}
+
+    def __setstate__(self, state):
+        self.width = state['width']
+        self.height = state['height']
+        self.max_open = state['max_open']
+        self.tabs = state['tabs']
+        self._open = OrderedDict()
+
+    @classmethod
+    def from_legacy(cls, bank: dict) -> 'Stash':
+        # Old worlds stored {'slots': N, 'items': [...]}; items may be Item objects or dicts.
+        # Tabs are filled one at a time, each built and encoded once; an item that does not
+        # fit the current tab starts the next. Items larger than a whole tab cannot be stored
+        # and are dropped with a log entry
+        stash = cls()
+        index, inventory = 0, item_model.Inventory(stash.width, stash.height)
+        for entry in bank.get('items', []):
+            if isinstance(entry, dict):
+                entry = item_model.make_item(entry.get('name', 'Item'), entry.get('type', 'Misc'),
+                                 entry.get('rarity', 'Common'), entry.get('stats', {}), tuple(entry.get('size', (1, 1))))
+            if not stash.fits(entry):
+                DebugLog.log(f"Stash migration skipped {entry.name}: {entry.size} does not fit a "
+                             f"{stash.width}x{stash.height} tab")
+                continue
+            if not inventory.add_item(entry):
+                stash._store(index, inventory)
+                index += 1
+                if index == len(stash.tabs):
+                    stash.add_tab()
+                inventory = item_model.Inventory(stash.width, stash.height)
+                inventory.add_item(entry)
+        stash._store(index, inventory)
+        return stash
+
+    @property
+    def slots(self) -> int:
+        return len(self.tabs) * self.width * self.height
+
+    def add_tab(self, name: Optional[str] = None) -> int:
+        self.tabs.append(StashTab(name or f"Tab {len(self.tabs) + 1}"))
+        return len(self.tabs) - 1
+
+    def item_count(self) -> int:
+        return sum(self._header(i).item_count for i in range(len(self.tabs)))
+
+    def free_cells(self, index: int) -> int:
+        return self.width * self.height - self._header(index).used_cells
+
+    def open_tab(self, index: int):
+        inventory = self._open.get(index)
+        if inventory is not None:
+            self._open.move_to_end(index)
+            return inventory
+        tab = self.tabs[index]
+        inventory = decode_tab(tab.blob) if tab.blob else item_model.Inventory(self.width, self.height)
+        tab.blob = None
+        self._open[index] = inventory
+        while len(self._open) > self.max_open:
+            old_index, old_inventory = self._open.popitem(last=False)
+            self._store(old_index, old_inventory)
+        return inventory
+
+    def close_tab(self, index: int):
+        inventory = self._open.pop(index, None)
+        if inventory is not None:
+            self._store(index, inventory)
+
+    def is_open(self, index: int) -> bool:
+        return index in self._open
+
+    def fits(self, item) -> bool:
+        # Whether the item fits an empty tab at all
+        w, h = item.size
+        return w <= self.width and h <= self.height
+
+    def deposit(self, item, tab: Optional[int] = None) -> Optional[int]:
+        # Put an item into `tab`, or the first tab with room; returns the tab index or None
+        w, h = item.size
+        candidates = [tab] if tab is not None else range(len(self.tabs))
+        for index in candidates:
+            if self.free_cells(index) < w * h:
+                continue
+            if self.open_tab(index).add_item(item):
+                return index
+        return None
+
+    def withdraw(self, item, tab: int) -> bool:
+        return self.open_tab(tab).remove_item(item)
+
+    def _header(self, index: int) -> StashTab:
+        tab = self.tabs[index]
+        inventory = self._open.get(index)
+        if inventory is not None:
+            items = inventory.items
+            tab.item_count = len(items)
+            tab.used_cells = sum(i.size[0] * i.size[1] for i in items)
+        return tab
+
+    def _store(self, index: int, inventory):
+        tab = self.tabs[index]
+        items = inventory.items
+        tab.item_count = len(items)
+        tab.used_cells = sum(i.size[0] * i.size[1] for i in items)
+        tab.blob = encode_tab(inventory) if items else None
+        self._open.pop(index, None)
@@ -0,0 +1,81 @@
+import itertools
+import random
+
+import pytest
+
+import item_model
+from build_optimizer import BUILD_FIELDS, PARAGON_VALUES, optimize_build, stat_vector
+from main_menu import ParagonSystem, PassiveNode, PassivesTree
+
+BASE = {'attack': 20, 'attack_speed': 1.0, 'crit_chance': 0.05, 'crit_mult': 1.5, 'life': 100}
+STAT_POOL = ['Power', 'Strength', 'Dexterity', 'Attack Speed', 'Crit Damage', 'Vitality', 'Armor']
+
+
+def _instance(rng):
+    items = [item_model.Item(f"Item {i}", rng.choice(['Weapon', 'Armor', 'Ring']), 'Rare',
+                             {s: rng.randint(1, 40) for s in rng.sample(STAT_POOL, 2)}) for i in range(8)]
+    tree = PassivesTree()
+    tree.points = 3
+    for i in range(4):
+        stat = rng.choice(STAT_POOL)
+        tree.add_node(PassiveNode(f"Node {i}", f"+{stat}", rng.randint(1, 2), unlocked=rng.random() < 0.2,
+                                  stats={stat: rng.randint(5, 30)}))
+    paragon = ParagonSystem()
+    paragon.max_points = 4
+    return items, tree, paragon
+
+
+def _dps(vec):
+    attack, speed, crit, mult, flat, percent, _ = vec
+    crit = min(crit, 1.0)
+    return ((attack + flat) * (1 + percent)) * speed * (1 + crit * (mult - 1))
+
+
+def _brute_force(items, tree, paragon, min_life):
+    # Every item choice (at most one per type), affordable passive subset and paragon split
+    base = [float(BASE.get(f, 0)) for f in BUILD_FIELDS]
+    for node in tree.nodes:
+        if node.unlocked:
+            base = [a + b for a, b in zip(base, stat_vector(node.stats))]
+    by_type = {}
+    for item in items:
+        by_type.setdefault(item.item_type, []).append(stat_vector(item.stats))
+    slot_options = [[None] + options for options in by_type.values()]
+    locked = [node for node in tree.nodes if not node.unlocked]
+    passive_options = [combo for r in range(len(locked) + 1) for combo in itertools.combinations(locked, r)
+                       if sum(n.required_points for n in combo) <= tree.points]
+    stats = list(PARAGON_VALUES)
+    points = paragon.max_points - paragon.points
+    splits = [split for split in itertools.product(range(points + 1), repeat=len(stats)) if sum(split) == points]
+    best = None
+    for picks in itertools.product(*slot_options):
+        for combo in passive_options:
+            vec = list(base)
+            for extra in [p for p in picks if p is not None] + [stat_vector(n.stats) for n in combo]:
+                vec = [a + b for a, b in zip(vec, extra)]
+            for split in splits:
+                total = list(vec)
+                for stat, count in zip(stats, split):
+                    field, value = PARAGON_VALUES[stat]
+                    total[BUILD_FIELDS.index(field)] += value * count
+                if total[BUILD_FIELDS.index('life')] >= min_life:
+                    dps = _dps(total)
+                    best = dps if best is None else max(best, dps)
+    return best
+
+
+@pytest.mark.parametrize('seed', range(12))
+def test_optimizer_matches_brute_force(seed):
+    rng = random.Random(seed)
+    items, tree, paragon = _instance(rng)
+    min_life = rng.choice([0, 150, 250])
+    result = optimize_build(BASE, items, tree, paragon, min_life=min_life)
+    expected = _brute_force(items, tree, paragon, min_life)
+    if expected is None:
+        assert result is None
+        return
+    assert result['dps'] == pytest.approx(expected, rel=1e-9)
+    assert result['life'] >= min_life
+    assert sum(result['paragon'].values()) <= paragon.max_points
+    assert len({item.item_type for item in result['items']}) == len(result['items'])
+    assert sum(node.required_points for node in result['passives']) <= tree.points
@@ -0,0 +1,154 @@
+import random
+
+import pytest
+
+import combat_system
+from combat_system import (TICK_RATE, CombatEngine, CombatLog, CombatStats, CombatSystem, DPSCalculator,
+                           StatusEffects)
+
+
+def _fight(attack_speed, seconds, buff=0.0):
+    # Player auto-attacks a dummy that cannot die or hit back; returns (damage dealt, expected dps)
+    player = {'stats': {'hp': 10 ** 9, 'attack': 200, 'attack_speed': attack_speed, 'crit_chance': 0.25}}
+    enemy = {'hp': 10 ** 12, 'attack': 0}
+    combat = CombatSystem(player, enemy, rng=random.Random(5), log=CombatLog(enabled=False))
+    if buff:
+        combat.apply_status('player', 'Haste', 2 * seconds * TICK_RATE, stat='attack_speed', amount=buff)
+    engine = CombatEngine(combat, auto_player=lambda engine: ('attack', None))
+    engine.run(max_ticks=seconds * TICK_RATE)
+    return combat.enemy_max_hp - combat.enemy_hp, combat.player_stats.dps
+
+
+@pytest.mark.parametrize('attack_speed', [0.5, 1.0, 1.5, 2.0])
+def test_engine_damage_matches_dps(attack_speed):
+    seconds = 600
+    dealt, dps = _fight(attack_speed, seconds)
+    assert dealt == pytest.approx(dps * seconds, rel=0.05)
+
+
+def test_attack_speed_buff_scales_damage_linearly():
+    seconds = 600
+    dealt, dps = _fight(1.0, seconds, buff=1.0)
+    assert dps == CombatStats.build(200, 2.0, 0.25, 2.0).dps
+    assert dealt == pytest.approx(dps * seconds, rel=0.05)
+
+
+def test_turn_based_attack_still_deals_dps():
+    player = {'stats': {'attack': 200, 'attack_speed': 2.0}}
+    combat = CombatSystem(player, {'hp': 10 ** 9}, rng=random.Random(1), log=CombatLog(enabled=False))
+    for _ in range(1000):
+        combat.player_attack()
+    assert combat.enemy_max_hp - combat.enemy_hp == pytest.approx(combat.player_stats.dps * 1000, rel=0.02)
+
+
+# --- DPSCalculator.calculate_batch ---
+
+def _dps_rows(n):
+    rng = random.Random(2)
+    return [(rng.randint(5, 500), rng.uniform(0.5, 2.5), rng.uniform(0.0, 0.6), rng.uniform(1.5, 3.5),
+             rng.randint(0, 50), rng.uniform(0.0, 1.5)) for _ in range(n)]
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_calculate_batch_matches_calculate(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(combat_system, 'numpy', None)
+    rows = _dps_rows(1000)
+    columns = [list(col) for col in zip(*rows)]
+    batch = DPSCalculator.calculate_batch(*columns)
+    assert type(batch) is list and all(type(v) is float for v in batch)
+    assert batch == [DPSCalculator.calculate(*row) for row in rows]
+    # Scalars broadcast against columns; all-scalar input is a one-row batch
+    assert DPSCalculator.calculate_batch(columns[0], 1.5, 0.2, 2.0) == [
+        DPSCalculator.calculate(b, 1.5, 0.2, 2.0) for b in columns[0]]
+    assert DPSCalculator.calculate_batch(100, 1.0, 0.0, 2.0) == [100.0]
+    with pytest.raises(ValueError):
+        DPSCalculator.calculate_batch([1, 2], [1.0, 2.0, 3.0], 0.0, 2.0)
+
+
+# --- StatusEffects ---
+
+def test_removed_effects_drop_out_of_lists_counts_and_modifiers():
+    effects = StatusEffects()
+    applied = [effects.apply('player', f"Buff {i}", 100, 0, stat='attack', amount=1) for i in range(10)]
+    for effect in applied[::3]:
+        effects.remove(effect)
+    effects.remove(applied[0])  # already removed: no-op
+    assert len(effects) == 6
+    assert effects.modifiers('player') == {'attack': 6}
+    assert effects['player'] == [e for i, e in enumerate(applied) if i % 3]
+    effects.clear('player')
+    assert len(effects) == 0 and effects['player'] == [] and effects.modifiers('player') == {'attack': 0}
+
+
+def test_refreshed_effect_expires_on_its_new_deadline():
+    effects = StatusEffects()
+    buff = effects.apply('player', "Haste", 10, 0, stat='attack_speed', amount=1)
+    effects.refresh(buff, 10, 5)
+    effects.advance(10)
+    assert buff.active and effects['player'] == [buff]
+    expired = []
+    effects.advance(15, lambda event, effect: expired.append((event, effect)))
+    assert expired == [('expire', buff)] and len(effects) == 0
+
+
+# --- simulate ---
+
+def test_simulate_is_independent_of_worker_count():
+    player = {'stats': {'hp': 60, 'max_hp': 60, 'attack': 9, 'mana': 30, 'max_mana': 30}}
+    skill = {'name': 'Bash', 'mana_cost': 10, 'power': 15}
+    enemy = combat_system.monster_enemy('zombie')
+    n = combat_system.SIM_CHUNK * 2 + 37
+    serial = combat_system.simulate(player, enemy, n, workers=1, seed=3, skill=skill)
+    assert combat_system.simulate(player, enemy, n, workers=2, seed=3, skill=skill) == serial
+    assert serial['fights'] == n and serial['wins'] == sum(serial['ttk'].values())
+    assert combat_system.simulate(player, enemy, n, workers=1, seed=4, skill=skill) != serial
+
+
+# --- CombatLog ---
+
+def test_log_keeps_the_newest_entries_in_order():
+    log = CombatLog(capacity=4)
+    for tick in range(10):
+        log.record(tick, 'player', 'attack', tick * 10)
+    assert len(log) == 4
+    assert [entry[0] for entry in log] == [6, 7, 8, 9]
+    assert log.tail(2) == [(8, 'player', 'attack', 80), (9, 'player', 'attack', 90)]
+    assert log.lines(1) == ["Player attacks for 90 damage!"]
+    log.append("Checkpoint")
+    assert log.lines(2) == ["Player attacks for 90 damage!", "Checkpoint"]
+    log.clear()
+    assert len(log) == 0 and log.tail(5) == []
+
+
+def test_disabled_log_records_nothing():
+    log = CombatLog(enabled=False)
+    log.record(1, 'enemy', 'attack', 5)
+    log.append("ignored")
+    assert len(log) == 0 and list(log) == []
+
+
+def test_log_formats_every_action():
+    assert CombatLog.format((0, 'enemy', 'defeated', 0)) == "Enemy defeated!"
+    assert CombatLog.format((0, 'player', 'Fireball', 30)) == "Player uses Fireball for 30 damage!"
+    assert CombatLog.format((0, 'enemy', 'pulse', 4)) == "enemy deals 4 damage!"
+    assert CombatLog.format((0, 'player', 'gains', 'Haste')) == "Player gains Haste."
+    assert CombatLog.format((0, 'player', 'fades', 'Haste')) == "Haste fades from player."
+
+
+# --- CombatStats ---
+
+def test_stats_snapshot_matches_the_dicts_and_follows_buffs():
+    player = {'stats': {'attack': 40, 'attack_speed': 1.25, 'crit_chance': 0.2, 'crit_mult': 2.5}}
+    combat = CombatSystem(player, {'hp': 500, 'attack': 12}, rng=random.Random(1), log=CombatLog(enabled=False))
+    stats = combat.player_stats
+    assert stats.dps == DPSCalculator.calculate(40, 1.25, 0.2, 2.5)
+    assert stats.hit == DPSCalculator.calculate(40, 1.0, 0.2, 2.5)
+    assert combat.enemy_stats == CombatStats.build(12, 1.0, 0.05, 1.5)
+    effect = combat.apply_status('player', 'Rage', 100, stat='attack', amount=10)
+    assert combat.player_stats == CombatStats.build(50, 1.25, 0.2, 2.5)
+    combat.status.remove(effect)
+    combat.refresh_stats()
+    assert combat.player_stats == stats
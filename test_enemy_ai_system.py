@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+import enemy_ai_system
+from enemy_ai_system import CHASE, IDLE, PATROL, EnemyAI, EnemyAIBatch
+from pathfinding_system import NavGrid, Pathfinder
+
+SIZE = 60
+
+
+def _run(seed, use_pathfinder, ticks=120):
+    # A batch of patrollers and idlers chasing a wandering party; returns per-tick (row, x, y, state, target)
+    rng = random.Random(seed)
+    finder = None
+    if use_pathfinder:
+        walls = {(x, y) for x in range(5, 55) for y in (15, 30, 45) if x % 12}
+        finder = Pathfinder(NavGrid(SIZE, SIZE, walls))
+    batch = EnemyAIBatch(capacity=4, aggro_radius=8, pathfinder=finder, speed=0.7)
+    party = [(rng.uniform(0, SIZE), rng.uniform(0, SIZE)) for _ in range(3)]
+    history = []
+    for tick in range(ticks):
+        if tick % 10 == 0:
+            for _ in range(rng.randint(1, 6)):
+                route = [(rng.uniform(0, SIZE), rng.uniform(0, SIZE)) for _ in range(rng.randint(0, 3))]
+                batch.add(None, route, position=(rng.uniform(0, SIZE), rng.uniform(0, SIZE)))
+            if len(batch) > 5:
+                batch.remove(rng.choice(batch.rows()))
+        party = [(min(max(px + rng.uniform(-1, 1), 0), SIZE - 1), min(max(py + rng.uniform(-1, 1), 0), SIZE - 1))
+                 for px, py in party]
+        batch.step(party)
+        history.append([(row, float(batch.x[row]), float(batch.y[row]), int(batch.state[row]), int(batch.target[row]))
+                        for row in batch.rows()])
+    return history
+
+
+@pytest.mark.parametrize('use_pathfinder', [False, True])
+def test_numpy_and_pure_python_steps_agree(monkeypatch, use_pathfinder):
+    pytest.importorskip('numpy')
+    vectorized = _run(21, use_pathfinder)
+    monkeypatch.setattr(enemy_ai_system, 'numpy', None)
+    looped = _run(21, use_pathfinder)
+    assert {state for tick in looped for *_, state, _ in tick} >= {IDLE, PATROL, CHASE}
+    for fast, slow in zip(vectorized, looped):
+        assert [(row, state, target) for row, _, _, state, target in fast] == \
+               [(row, state, target) for row, _, _, state, target in slow]
+        assert [xy for row in fast for xy in row[1:3]] == pytest.approx([xy for row in slow for xy in row[1:3]],
+                                                                        abs=1e-9)
+
+
+def test_views_match_the_batch_step():
+    batch = EnemyAIBatch(aggro_radius=5)
+    views = [EnemyAI(None, [(0, 0), (10, 0)], batch=batch) for _ in range(3)]
+    views[1].position = (20, 20)
+    views[2].position = (3, 3)
+    for view in views:
+        view.update((4, 4))
+    assert [view.state for view in views] == ['patrol', 'patrol', 'chase']
+    solo = EnemyAI(None, [(0, 0), (10, 0)])
+    solo.position = (3, 3)
+    solo.update((4, 4))
+    assert solo.state == 'chase'
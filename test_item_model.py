@@ -0,0 +1,238 @@
+import gc
+import importlib.util
+import pickle
+import random
+import sys
+
+import character_system
+import item_model
+import loot_system
+from item_model import Inventory, Item, ItemBase, module
+
+FreeRectIndex = module.FreeRectIndex
+
+SIZES = [(1, 1), (1, 2), (2, 1), (2, 2), (1, 3), (2, 3), (3, 2), (1, 4)]
+
+
+def _items(rng, n):
+    return [Item(f"Item {i}", "Misc", "Common", {}, rng.choice(SIZES)) for i in range(n)]
+
+
+def _snapshot(inv):
+    return [row[:] for row in inv.grid], list(inv._rows), dict(inv._placed)
+
+
+def _used_cells(inv):
+    return sum(w * h for _, _, w, h in inv._placed.values())
+
+
+def _check_consistent(inv):
+    # grid view, row bitmasks and placement map all describe the same layout
+    for y in range(inv.height):
+        mask = sum(1 << x for x in range(inv.width) if inv.grid[y][x] is not None)
+        assert inv._rows[y] == mask
+    for item, (x, y, w, h) in inv._placed.items():
+        assert all(inv.grid[yy][xx] is item for yy in range(y, y + h) for xx in range(x, x + w))
+    assert _used_cells(inv) == sum(bin(row).count('1') for row in inv._rows)
+
+
+def _scan_can_place(inv, w, h, x, y, ignore=None):
+    # Reference fit test on the item grid, cell by cell; cells of `ignore` count as free
+    return (x >= 0 and y >= 0 and x + w <= inv.width and y + h <= inv.height
+            and all(inv.grid[yy][xx] in (None, ignore) for yy in range(y, y + h) for xx in range(x, x + w)))
+
+
+def _churn(rng, inv, steps):
+    # Random adds and removals; yields after each step
+    for i in range(steps):
+        if inv.items and rng.random() < 0.35:
+            inv.remove_item(rng.choice(inv.items))
+        else:
+            inv.add_item(Item(f"Item {i}", "Misc", "Common", {}, rng.choice(SIZES)))
+        yield
+
+
+# --- occupancy bitmasks ---
+
+def test_can_place_matches_a_cell_scan():
+    rng = random.Random(11)
+    inv = Inventory(10, 6)
+    for _ in _churn(rng, inv, 200):
+        _check_consistent(inv)
+        probe = Item("Probe", "Misc", "Common", {}, rng.choice(SIZES))
+        w, h = probe.size
+        for y in range(-1, inv.height + 1):
+            for x in range(-1, inv.width + 1):
+                assert inv.can_place(probe, x, y) == _scan_can_place(inv, w, h, x, y)
+
+
+# --- free-rectangle index and auto_pack ---
+
+def _scan_spot(inv, w, h):
+    # Reference first fit: row-major scan of every position
+    for y in range(inv.height):
+        for x in range(inv.width):
+            if _scan_can_place(inv, w, h, x, y):
+                return x, y
+    return None
+
+
+def test_find_spot_matches_a_row_major_scan():
+    rng = random.Random(12)
+    inv = Inventory(10, 6)
+    for _ in _churn(rng, inv, 300):
+        for w, h in SIZES + [(3, 3), (10, 1), (1, 6), (11, 1)]:
+            assert inv.find_spot(w, h) == _scan_spot(inv, w, h)
+
+
+def test_incremental_rects_match_a_rebuild_from_rows():
+    rng = random.Random(13)
+    for _ in range(100):
+        inv = Inventory(10, 6)
+        inv.free_rects()
+        for item in _items(rng, 20):
+            inv.add_item(item)
+            rebuilt = FreeRectIndex.from_rows(inv._rows, inv.width, inv.height)
+            assert sorted(inv.free_rects().rects) == sorted(rebuilt.rects)
+
+
+def test_auto_pack_keeps_every_item_or_changes_nothing():
+    rng = random.Random(14)
+    for _ in range(200):
+        inv = Inventory(8, 5)
+        for _ in _churn(rng, inv, 40):
+            pass
+        before = _snapshot(inv)
+        extra = _items(rng, 2)
+        if inv.auto_pack(extra=extra):
+            assert set(inv.items) == set(before[2]) | set(extra)
+            _check_consistent(inv)
+        else:
+            assert _snapshot(inv) == before
+
+
+# --- placement and name maps ---
+
+def test_remove_move_and_find_follow_a_plain_model():
+    rng = random.Random(15)
+    inv = Inventory(10, 6)
+    model = {}  # item -> name, for every placed item
+    for step in range(400):
+        roll = rng.random()
+        if model and roll < 0.3:
+            item = rng.choice(list(model))
+            assert inv.remove_item(item)
+            assert not inv.remove_item(item)
+            assert inv.locate(item) is None
+            del model[item]
+        elif model and roll < 0.5:
+            item = rng.choice(list(model))
+            x, y = rng.randrange(inv.width), rng.randrange(inv.height)
+            old = inv.locate(item)
+            w, h = item.size
+            fits = _scan_can_place(inv, w, h, x, y, ignore=item)
+            assert inv.move_item(item, x, y) == fits
+            assert inv.locate(item) == ((x, y, w, h) if fits else old)
+        else:
+            item = Item(f"Gem {rng.randrange(8)}", "Misc", "Common", {}, rng.choice(SIZES))
+            if inv.add_item(item):
+                model[item] = item.name
+        _check_consistent(inv)
+        assert set(inv.items) == set(model)
+        for name in {f"Gem {i}" for i in range(8)}:
+            expected = [item for item in inv.items if model[item] == name]
+            assert inv.find_items(name) == expected
+            assert inv.find_item(name) is (expected[0] if expected else None)
+
+
+# --- add_items (batch packing) ---
+
+def test_add_items_is_atomic_by_default():
+    inv = Inventory(4, 2)
+    inv.add_item(Item("Helm", "Armor", "Rare", {}, (2, 2)))
+    before = _snapshot(inv)
+    batch = [Item("Shield", "Armor", "Rare", {}, (2, 2)), Item("Axe", "Weapon", "Rare", {}, (1, 2)),
+             Item("Gem", "Misc", "Rare", {}, (1, 1))]
+    rejected = inv.add_items(batch)
+    assert rejected and set(rejected) <= set(batch)
+    assert _snapshot(inv) == before
+
+
+def test_add_items_partial_places_what_fits():
+    inv = Inventory(4, 2)
+    inv.add_item(Item("Helm", "Armor", "Rare", {}, (2, 2)))
+    batch = [Item("Shield", "Armor", "Rare", {}, (2, 2)), Item("Axe", "Weapon", "Rare", {}, (1, 2))]
+    rejected = inv.add_items(batch, partial=True)
+    assert rejected == [batch[1]]
+    assert inv.locate(batch[0]) == (2, 0, 2, 2)
+    _check_consistent(inv)
+
+
+def test_add_items_rejects_duplicates_and_placed_items():
+    inv = Inventory(4, 4)
+    gem = Item("Gem", "Misc", "Rare", {}, (1, 1))
+    inv.add_item(gem)
+    ring = Item("Ring", "Misc", "Rare", {}, (1, 1))
+    assert inv.add_items([gem, ring, ring], partial=True) == [gem, ring]
+    assert inv.locate(ring) is not None
+
+
+def test_add_items_never_packs_worse_than_sequential_first_fit():
+    rng = random.Random(7)
+    for _ in range(500):
+        items = _items(rng, rng.randint(5, 25))
+        sequential = Inventory(10, 4)
+        all_fit = all([sequential.add_item(item) for item in items])
+        batch = Inventory(10, 4)
+        assert (batch.add_items(items) == []) >= all_fit
+        packed = Inventory(10, 4)
+        packed.add_items(items, partial=True)
+        _check_consistent(packed)
+        assert _used_cells(packed) >= _used_cells(sequential)
+
+
+# --- flyweight items ---
+
+def test_stats_writes_go_through_to_the_item():
+    blade = Item("Blade", "Weapon", "Legendary", {"Damage": 100, "Crit": 5})
+    blade.stats["Damage"] += 5
+    blade.stats.update(Speed=3)
+    del blade.stats["Crit"]
+    assert blade.stats == {"Damage": 105, "Speed": 3}
+    assert blade.stat("Speed") == 3
+
+
+def test_masterwork_and_tempering_change_stats():
+    blade = Item("Blade", "Weapon", "Legendary", {"Damage": 100, "Speed": 3})
+    assert character_system.MasterworkSystem().masterwork(blade)
+    assert character_system.TemperingSystem().temper(blade, "Speed", 4)
+    assert blade.rarity == "Masterwork"
+    assert blade.stats == {"Damage": 120, "Speed": 7}
+
+
+def test_equal_items_share_a_base_and_unused_bases_are_dropped():
+    a = Item("Shard", "Misc", "Common", {"Power": 1})
+    b = Item("Shard", "Misc", "Common", {"Power": 9})
+    assert a.base is b.base and a.rolls != b.rolls
+    restored = pickle.loads(pickle.dumps([a, b]))
+    assert restored[0].base is restored[1].base is a.base
+    before = len(ItemBase._registry)
+    junk = [Item(f"Junk {i}", "Misc", "Common", {}) for i in range(100)]
+    assert len(ItemBase._registry) == before + 100
+    del junk
+    gc.collect()
+    assert len(ItemBase._registry) == before
+
+
+# --- shared item module ---
+
+def test_item_module_is_loaded_once_and_shared(monkeypatch):
+    assert sys.modules[item_model.ITEM_MODULE_NAME] is item_model.module
+    assert character_system.LootSystem.engine()._item_base is ItemBase
+
+    def no_reload(*args, **kwargs):
+        raise AssertionError("item module re-resolved")
+    monkeypatch.setattr(importlib.util, 'spec_from_file_location', no_reload)
+    drops = loot_system.default_engine().generate_batch(20, 'Rogue', random.Random(1))
+    drops.append(character_system.LootSystem.generate_loot('Rogue', random.Random(2)))
+    assert all(type(item) is Item for item in drops)
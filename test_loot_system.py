@@ -0,0 +1,92 @@
+import random
+from collections import Counter
+
+import pytest
+
+import game_assets
+import loot_system
+from character_system import LootSystem
+from loot_system import LOOT_RARITIES, AliasTable, LootEngine
+
+
+def test_gear_drops_keep_mythic_at_its_old_share():
+    drops = LootSystem.generate_batch(40000, 'Rogue', random.Random(3))
+    counts = Counter(item.rarity for item in drops)
+    assert set(counts) == set(LootSystem.RARITIES)
+    for rarity in LootSystem.RARITIES:
+        assert abs(counts[rarity] / len(drops) - 0.25) < 0.01
+    mythic = next(item for item in drops if item.rarity == 'Mythic')
+    assert mythic.stats.keys() == {'Power'}
+
+
+@pytest.mark.parametrize('world_tier', [0, -1, game_assets.MAX_WORLD_TIER + 1, 1.5, '2', True])
+def test_bad_world_tier_is_rejected(world_tier):
+    with pytest.raises(ValueError):
+        loot_system.roll_kill('zombie', world_tier)
+    with pytest.raises(ValueError):
+        loot_system.drop_table('zombie', world_tier)
+    with pytest.raises(ValueError):
+        game_assets.register_monster('test_tiered', {'name': "Test", 'world_tier': world_tier})
+    assert 'test_tiered' not in game_assets.MONSTERS
+
+
+def test_world_tiers_raise_drop_chance_up_to_the_cap():
+    chances = [loot_system.drop_table('zombie', tier).drop_chance for tier in range(1, game_assets.MAX_WORLD_TIER + 1)]
+    assert chances == sorted(chances) and chances[-1] <= 1.0
+    with pytest.raises(ValueError):
+        game_assets.register_monster('test_bad_chance', {'name': "Test", 'drop_chance': 1.5})
+
+
+# --- alias tables ---
+
+def _implied(table):
+    # Exact outcome probabilities encoded by an alias table
+    dist = [0.0] * table.n
+    for i in range(table.n):
+        dist[i] += table.prob[i] / table.n
+        dist[table.alias[i]] += (1.0 - table.prob[i]) / table.n
+    return dist
+
+
+def test_alias_table_encodes_the_weights_exactly():
+    rng = random.Random(16)
+    for _ in range(200):
+        weights = [rng.choice([0, rng.random(), rng.randint(1, 100)]) for _ in range(rng.randint(1, 12))]
+        weights[rng.randrange(len(weights))] += 1
+        table = AliasTable(weights)
+        total = sum(weights)
+        assert _implied(table) == pytest.approx([w / total for w in weights], abs=1e-12)
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+def test_alias_table_draws_follow_the_weights():
+    weights = [r['weight'] for r in LOOT_RARITIES]
+    counts = Counter(AliasTable(weights).sample_n(200000, random.Random(17)))
+    for i, w in enumerate(weights):
+        assert abs(counts[i] / 200000 - w / sum(weights)) < 0.005
+
+
+def test_numpy_draws_match_the_pure_python_draws():
+    numpy = pytest.importorskip('numpy')
+    table = AliasTable([r['weight'] for r in LOOT_RARITIES])
+    # Same uniforms in, same outcomes out
+    vectorized = table.sample_array(5000, numpy.random.default_rng(18))
+    assert vectorized.tolist() == table.sample_n(5000, numpy.random.default_rng(18))
+
+
+def test_numpy_and_pure_python_rolls_agree_in_distribution():
+    numpy = pytest.importorskip('numpy')
+    engine = LootEngine()
+    n = 100000
+    for rng in (random.Random(19), numpy.random.default_rng(19)):
+        rarity, item_type, affix, power, affix_value = (list(col) for col in engine.roll_arrays(n, rng))
+        counts = Counter(rarity)
+        for i, r in enumerate(LOOT_RARITIES):
+            assert abs(counts[i] / n - r['weight'] / 100) < 0.005
+        assert set(item_type) == {0, 1}
+        assert all((a >= 0) == (r >= engine.affix_from) for r, a in zip(rarity, affix))
+        assert min(power) == 10 and max(power) == 100
+        assert all(1 <= v <= 20 if a >= 0 else v == 0 for a, v in zip(affix, affix_value))
+        drops = engine.generate_batch(50, 'Rogue', rng)
+        assert all(type(roll) is int for item in drops for roll in item.rolls)
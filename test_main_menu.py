@@ -0,0 +1,62 @@
+import quests_system
+import rng_system
+from main_menu import KILL_XP_PER_LEVEL, MainMenuGUI
+from save_system import AutosaveService, CharacterSaveFile, GameJournal
+
+
+def _menu(tmp_path):
+    # MainMenuGUI's save and journal state without a Tk window
+    menu = MainMenuGUI.__new__(MainMenuGUI)
+    menu.character_save = CharacterSaveFile(str(tmp_path / 'characters.d4save'))
+    menu.autosave = AutosaveService(str(tmp_path / 'autosave.d4save'), delay=0)
+    menu.journal = GameJournal(str(tmp_path / 'game.journal'), str(tmp_path / 'game.checkpoint'),
+                               background=menu.autosave.run)
+    menu._checkpoint_retry = False
+    menu.game_stats = {'monsters_defeated': 0}
+    menu.game_world = {'zone': 'Kyovashad', 'world_tier': 1}
+    menu.character = {'name': 'Ada', 'class': 'Rogue', 'level': 1, 'xp': 0, 'inventory': [], 'quests': []}
+    menu.character_slot = menu.character_save.reserve_slot()
+    return menu
+
+
+def test_victory_and_quests_are_journaled(tmp_path):
+    rng_system.reseed(11)
+    menu = _menu(tmp_path)
+    menu.checkpoint_game()
+    assert menu.autosave.flush(timeout=5)
+    for _ in range(20):
+        menu._on_victory('zombie')
+    quests = quests_system.QuestsSystem(
+        menu.character['quests'], record=lambda op, quest: menu.record_event(op, ('character', 'quests'), quest))
+    quests.add_quest("The Butcher")
+    quests.add_quest("Cellar")
+    quests.remove_quest("Cellar")
+    assert menu.game_stats['monsters_defeated'] == 20
+    assert menu.character['xp'] == 20 * KILL_XP_PER_LEVEL
+    assert menu.character['inventory']
+    menu.journal.close()
+    assert menu.autosave.flush(timeout=5)
+    menu.autosave.close()
+
+    recovered = GameJournal(str(tmp_path / 'game.journal'), str(tmp_path / 'game.checkpoint')).recover()
+    assert recovered['game_stats']['monsters_defeated'] == 20
+    character = recovered['character']
+    assert character['xp'] == 20 * KILL_XP_PER_LEVEL
+    assert [item.name for item in character['inventory']] == [item.name for item in menu.character['inventory']]
+    assert character['quests'] == [{'name': "The Butcher", 'status': "Active"}]
+    # The slot record follows the journal too
+    slot = CharacterSaveFile(menu.character_save.path).load_slot(menu.character_slot)
+    assert slot['xp'] == 20 * KILL_XP_PER_LEVEL
+    assert slot['quests'] == character['quests']
+
+
+def test_checkpoint_recovers_from_a_closed_autosave(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # DebugLog writes debug.log in the working directory
+    menu = _menu(tmp_path)
+    menu.autosave.close()
+    menu.checkpoint_game()
+    menu.autosave = AutosaveService(str(tmp_path / 'autosave.d4save'), delay=0)
+    menu.checkpoint_game()
+    assert menu.autosave.flush(timeout=5)
+    menu.autosave.close()
+    assert (tmp_path / 'game.checkpoint').exists()
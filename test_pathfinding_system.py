@@ -0,0 +1,90 @@
+import random
+from collections import deque
+
+from pathfinding_system import NavGrid, Pathfinder
+
+
+def _grid(rng, width=24, height=18, density=0.3):
+    blocked = {(x, y) for x in range(width) for y in range(height) if rng.random() < density}
+    return NavGrid(width, height, blocked, cell_size=rng.choice([1.0, 2.5]))
+
+
+def _bfs(grid, source):
+    # Reference: step distance from source to every cell, -1 if unreachable
+    distance = [-1] * (grid.width * grid.height)
+    distance[source] = 0
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        for nb in grid.neighbors(current):
+            if distance[nb] < 0:
+                distance[nb] = distance[current] + 1
+                queue.append(nb)
+    return distance
+
+
+def _walkable_cells(grid):
+    return [grid.cell(i) for i in range(grid.width * grid.height) if grid.walkable[i]]
+
+
+def test_astar_paths_are_shortest():
+    rng = random.Random(25)
+    for _ in range(30):
+        grid = _grid(rng)
+        finder = Pathfinder(grid)
+        cells = _walkable_cells(grid)
+        for _ in range(20):
+            start, goal = rng.choice(cells), rng.choice(cells)
+            distance = _bfs(grid, grid.index(*start))[grid.index(*goal)]
+            path = finder.astar(start, goal)
+            if distance < 0:
+                assert path is None
+                continue
+            assert len(path) - 1 == distance
+            assert path[0] == start and path[-1] == goal
+            for a, b in zip(path, path[1:]):
+                assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and grid.walkable[grid.index(*b)]
+
+
+def test_flow_fields_lead_to_the_goal_in_bfs_steps():
+    rng = random.Random(26)
+    for _ in range(20):
+        grid = _grid(rng)
+        finder = Pathfinder(grid)
+        goal = grid.index(*rng.choice(_walkable_cells(grid)))
+        field = finder.field_at(goal)
+        reference = _bfs(grid, goal)
+        assert list(field.distance) == reference
+        for cell, steps in enumerate(reference):
+            if steps <= 0:
+                continue
+            for _ in range(steps):
+                cell = int(field.next_cell[cell])
+            assert cell == goal
+
+
+def test_path_waypoints_are_in_line_of_sight():
+    rng = random.Random(27)
+    for _ in range(30):
+        grid = _grid(rng, density=0.2)
+        finder = Pathfinder(grid)
+        cells = _walkable_cells(grid)
+        for _ in range(10):
+            start, goal = (grid.center(grid.index(*rng.choice(cells))) for _ in range(2))
+            waypoints = finder.path(start, goal)
+            if finder.astar(grid.cell(grid.index_of(*start)), grid.cell(grid.index_of(*goal))) is None:
+                assert waypoints is None
+                continue
+            assert waypoints[-1] == goal
+            for a, b in zip([start] + waypoints, waypoints):
+                assert finder.line_clear(a, b)
+
+
+def test_grid_changes_drop_cached_fields():
+    grid = NavGrid(10, 1)
+    finder = Pathfinder(grid)
+    assert finder.player_field('p1', (9.5, 0.5)).distance[0] == 9
+    assert finder.player_field('p1', (9.2, 0.2)) is finder.player_field('p1', (9.9, 0.9))
+    grid.set_blocked((5, 0))
+    assert finder.player_field('p1', (9.5, 0.5)).distance[0] == -1
+    assert finder.astar((0, 0), (9, 0)) is None
@@ -0,0 +1,285 @@
+import copy
+import io
+import os
+import pickle
+
+import pytest
+
+import save_system
+from save_system import CharacterSaveFile
+
+
+def _character(name, level=1, **extra):
+    return dict({'name': name, 'class': 'Rogue', 'level': level, 'hardcore': False}, **extra)
+
+
+# --- slotted character container ---
+
+def test_slot_round_trip(tmp_path):
+    path = str(tmp_path / 'characters.d4save')
+    saves = CharacterSaveFile(path)
+    saves.save_slot(0, _character('Ada', 12, inventory=['Sword'] * 50))
+    saves.save_slot(3, _character('Brom', 7))
+    saves.save_slot(0, _character('Ada', 13, inventory=['Sword'] * 80))
+
+    reopened = CharacterSaveFile(path)
+    assert reopened.occupied_slots() == [0, 3]
+    assert reopened.load_slot(0)['level'] == 13
+    assert len(reopened.load_slot(0)['inventory']) == 80
+    assert reopened.load_slot(3)['name'] == 'Brom'
+    assert reopened.load_slot(5) is None
+    summaries = {s['slot']: s for s in reopened.list_summaries()}
+    assert summaries[0]['name'] == 'Ada' and summaries[0]['level'] == 13
+    assert summaries[3]['class'] == 'Rogue'
+
+
+def test_delete_and_reserve(tmp_path):
+    saves = CharacterSaveFile(str(tmp_path / 'characters.d4save'))
+    saves.save_slot(0, _character('Ada'))
+    saves.save_slot(1, _character('Brom'))
+    saves.delete_slot(0)
+    assert saves.occupied_slots() == [1]
+    assert saves.reserve_slot() == 0
+    assert saves.first_free_slot() == 2
+    saves.save_slot(0, _character('Cora'))
+    assert CharacterSaveFile(saves.path).load_slot(0)['name'] == 'Cora'
+
+
+def test_legacy_pickle_migrates(tmp_path):
+    path = str(tmp_path / 'characters.d4save')
+    with open(path, 'wb') as f:
+        pickle.dump([_character('Ada', 3), _character('Brom', 4)], f)
+    saves = CharacterSaveFile(path)
+    assert [c['name'] for c in saves.load_all()] == ['Ada', 'Brom']
+    assert [s['level'] for s in saves.list_summaries()] == [3, 4]
+
+
+def test_crash_mid_save_keeps_previous_record(tmp_path, monkeypatch):
+    path = str(tmp_path / 'characters.d4save')
+    CharacterSaveFile(path).save_slot(0, _character('Ada', 5))
+
+    def crash(fd):
+        raise OSError("power lost")
+    monkeypatch.setattr(save_system.os, 'fsync', crash)
+    with pytest.raises(OSError):
+        CharacterSaveFile(path).save_slot(0, _character('Ada', 6, inventory=['Axe'] * 500))
+    monkeypatch.undo()
+
+    assert CharacterSaveFile(path).load_slot(0)['level'] == 5
+
+
+def test_corrupted_record_is_reported(tmp_path):
+    path = str(tmp_path / 'characters.d4save')
+    saves = CharacterSaveFile(path)
+    saves.save_slot(0, _character('Ada'))
+    offset = saves.list_summaries()[0]['offset']
+    with open(path, 'r+b') as f:
+        f.seek(offset + 4)
+        byte = f.read(1)
+        f.seek(offset + 4)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    with pytest.raises(ValueError, match="corrupted"):
+        CharacterSaveFile(path).load_slot(0)
+
+
+# --- chunked game saves ---
+
+def _game_state():
+    return {
+        'character': _character('Ada', 40, inventory=[f"Item {i}" for i in range(3000)]),
+        'game_world': {'zone': 'Kyovashad', 'bank': {'items': list(range(5000))}},
+        'game_stats': {'monsters_defeated': 12},
+    }
+
+
+def _dump(state, chunk_size=1024):
+    f = io.BytesIO()
+    save_system.dump_chunked(state, f, chunk_size=chunk_size)
+    return bytearray(f.getvalue())
+
+
+def _load(data):
+    return save_system.load_chunked(io.BytesIO(bytes(data)))
+
+
+def _chunk_offsets(data):
+    # (offset, kind) of every chunk header in an intact v2 stream
+    offsets, pos = [], save_system._CHUNK_FILE_HEADER.size
+    while pos < len(data):
+        kind, _, stored_len, _, _ = save_system._CHUNK_HEADER.unpack_from(data, pos)
+        offsets.append((pos, kind))
+        pos += save_system._CHUNK_HEADER.size + stored_len
+    return offsets
+
+
+@pytest.mark.parametrize('codec', [save_system.CODEC_ZLIB, save_system.CODEC_LZMA])
+def test_chunked_round_trip(tmp_path, codec):
+    state = _game_state()
+    path = str(tmp_path / 'game.sav')
+    save_system.save_game_file(path, state, codec)
+    assert save_system.load_game_file(path) == (state, [])
+
+    snapshot = save_system.StateSnapshot(state)
+    f = io.BytesIO()
+    save_system.write_chunked_sections(snapshot.sections(), f, codec, chunk_size=512)
+    f.seek(0)
+    assert save_system.load_chunked(f) == (state, [])
+
+
+def test_autosave_writes_the_state_as_of_the_request(tmp_path):
+    state = _game_state()
+    expected = copy.deepcopy(state)
+    path = str(tmp_path / 'autosave.d4save')
+    autosave = save_system.AutosaveService(path, delay=0.2)
+    autosave.request(state)
+    # Changes made after the request, the way record_event makes them
+    autosave.before_change('character')
+    state['character']['level'] = 41
+    autosave.before_change(save_system.state_section(('game_world', 'bank', 'items')))
+    state['game_world']['bank']['items'].append(-1)
+    assert autosave.flush(timeout=5)
+    autosave.close()
+    assert save_system.load_game_file(path) == (expected, [])
+
+
+def test_damaged_payload_loses_only_its_section():
+    data = _dump(_game_state())
+    pos = next(p for p, kind in _chunk_offsets(data) if kind == save_system._CHUNK_DATA)
+    data[pos + save_system._CHUNK_HEADER.size] ^= 0xFF
+    state, damaged = _load(data)
+    assert damaged == ['character']
+    assert 'character' not in state
+    assert state['game_world']['bank']['items'] == list(range(5000))
+
+
+def test_damaged_section_header_is_reported():
+    data = _dump(_game_state())
+    sections = [p for p, kind in _chunk_offsets(data) if kind == save_system._CHUNK_SECTION]
+    # Corrupt the 'game_world/zone' name: the header stays intact but the payload crc fails
+    data[sections[1] + save_system._CHUNK_HEADER.size] ^= 0xFF
+    state, damaged = _load(data)
+    assert '(damaged section header)' in damaged
+    assert state['character']['level'] == 40
+    assert state['game_stats'] == {'monsters_defeated': 12}
+
+
+def test_every_header_byte_flip_is_detected():
+    state = _game_state()
+    data = _dump(state)
+    for pos, _ in _chunk_offsets(data):
+        for i in range(save_system._CHUNK_HEADER.size):
+            flipped = bytearray(data)
+            flipped[pos + i] ^= 0x01
+            loaded, damaged = _load(flipped)
+            assert damaged, f"flip at {pos + i} went unnoticed"
+            for key, value in loaded.items():
+                if key == 'game_world':
+                    for sub_key, sub_value in value.items():
+                        assert sub_value == state[key][sub_key]
+                else:
+                    assert value == state[key]
+
+
+def test_torn_tail_keeps_complete_sections():
+    state = _game_state()
+    data = _dump(state)
+    last_section = [p for p, kind in _chunk_offsets(data) if kind == save_system._CHUNK_SECTION][-1]
+    loaded, damaged = _load(data[:last_section + 3])
+    assert damaged == ['(truncated save)']
+    assert loaded['character'] == state['character']
+    assert loaded['game_world'] == state['game_world']
+    assert 'game_stats' not in loaded
+
+
+# --- game journal ---
+
+def _journal(tmp_path, **kwargs):
+    return save_system.GameJournal(str(tmp_path / 'game.journal'), str(tmp_path / 'game.checkpoint'), **kwargs)
+
+
+def test_journal_replays_without_checkpoint(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append('set', ('game_world', 'zone'), 'Kyovashad')
+    journal.append('add', ('game_stats', 'characters_created'), 1)
+    journal.append('add', ('game_stats', 'characters_created'), 1)
+    journal.close()
+    state = _journal(tmp_path).recover()
+    assert state == {'game_world': {'zone': 'Kyovashad'}, 'game_stats': {'characters_created': 2}}
+
+
+def test_journal_replays_on_top_of_checkpoint(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append('add', ('game_stats', 'characters_created'), 1)
+    seq = journal.begin_checkpoint()
+    journal.write_checkpoint(save_system.StateSnapshot({'game_stats': {'characters_created': 1}}), seq)
+    journal.append('set', ('game_world', 'zone'), 'Gea Kul')
+    journal.close()
+
+    reopened = _journal(tmp_path)
+    assert reopened.recover() == {'game_stats': {'characters_created': 1}, 'game_world': {'zone': 'Gea Kul'}}
+    assert reopened.seq == 2
+    assert reopened.state_at(1) == {'game_stats': {'characters_created': 1}}
+
+
+def test_journal_drops_torn_tail(tmp_path):
+    journal = _journal(tmp_path)
+    for i in range(5):
+        journal.append('add', ('game_stats', 'characters_created'), 1)
+    journal.close()
+    path = str(tmp_path / 'game.journal')
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size - 3)
+
+    reopened = _journal(tmp_path)
+    assert reopened.recover() == {'game_stats': {'characters_created': 4}}
+    assert reopened.seq == 4
+    # The torn record is cut off, so new appends follow the last intact one
+    reopened.append('set', ('game_world', 'zone'), 'Kyovashad')
+    reopened.close()
+    assert _journal(tmp_path).recover() == {'game_stats': {'characters_created': 4},
+                                            'game_world': {'zone': 'Kyovashad'}}
+
+
+def test_journal_stops_at_corrupted_record(tmp_path):
+    journal = _journal(tmp_path)
+    for zone in ('Kyovashad', 'Gea Kul', 'Zarbinzet'):
+        journal.append('set', ('game_world', 'zone'), zone)
+    journal.close()
+    path = str(tmp_path / 'game.journal')
+    with open(path, 'r+b') as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b'\0\0')
+    assert _journal(tmp_path).recover() == {'game_world': {'zone': 'Gea Kul'}}
+
+
+def test_journal_fsyncs_on_the_background_runner(tmp_path, monkeypatch):
+    jobs = []
+    journal = _journal(tmp_path, sync_every=2, background=lambda key, job: jobs.append((key, job)))
+    synced = []
+    monkeypatch.setattr(save_system.os, 'fsync', synced.append)
+    for _ in range(4):
+        journal.append('add', ('game_stats', 'characters_created'), 1)
+    assert synced == []
+    assert [key for key, _ in jobs] == [('fsync', journal.path)] * 2
+    for _, job in jobs:
+        job()
+    assert len(synced) == 2
+    monkeypatch.undo()
+    journal.close()
+
+
+def test_aborted_checkpoint_keeps_records_and_allows_the_next(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append('add', ('game_stats', 'characters_created'), 1)
+    seq = journal.begin_checkpoint()
+    assert journal.begin_checkpoint() is None
+    journal.abort_checkpoint()
+    journal.append('add', ('game_stats', 'characters_created'), 1)
+    seq = journal.begin_checkpoint()
+    assert seq == 2
+    journal.append('set', ('game_world', 'zone'), 'Gea Kul')
+    journal.close()
+    # The second checkpoint never lands either: both rotated segments must still replay
+    assert _journal(tmp_path).recover() == {'game_stats': {'characters_created': 2},
+                                            'game_world': {'zone': 'Gea Kul'}}
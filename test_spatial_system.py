@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from spatial_system import PICKUP_RADIUS, SpatialHash, aoe_targets, pick_up
+
+
+def _brute_query(points, x, y, radius):
+    return {key for key, (px, py) in points.items() if (px - x) ** 2 + (py - y) ** 2 <= radius * radius}
+
+
+@pytest.mark.parametrize('cell_size', [0.5, 2.0, 4.0, 50.0])
+def test_queries_match_brute_force_through_moves(cell_size):
+    rng = random.Random(24)
+    grid = SpatialHash(cell_size)
+    points = {}
+    for step in range(3000):
+        roll = rng.random()
+        if points and roll < 0.4:
+            key = rng.choice(list(points))
+            x, y = points[key]
+            points[key] = (x + rng.uniform(-3, 3), y + rng.uniform(-3, 3))
+            grid.move(key, *points[key])
+        elif points and roll < 0.5:
+            key = rng.choice(list(points))
+            del points[key]
+            grid.remove(key)
+        else:
+            points[step] = (rng.uniform(-40, 40), rng.uniform(-40, 40))
+            grid.insert(step, *points[step])
+        if step % 20 == 0:
+            x, y, radius = rng.uniform(-50, 50), rng.uniform(-50, 50), rng.choice([0.0, 1.0, 5.0, 30.0, 200.0])
+            assert set(grid.query(x, y, radius)) == _brute_query(points, x, y, radius)
+            near = grid.nearest(x, y, radius)
+            if near is None:
+                assert not _brute_query(points, x, y, radius)
+            else:
+                best = min((px - x) ** 2 + (py - y) ** 2 for px, py in points.values())
+                nx, ny = points[near]
+                assert (nx - x) ** 2 + (ny - y) ** 2 == best
+    assert len(grid) == len(points)
+    assert all(grid.position(key) == points[key] for key in points)
+
+
+def test_aoe_and_pickup_use_their_radii():
+    enemies = SpatialHash()
+    for i, x in enumerate([0.5, 2.9, 3.1, 4.9, 5.1]):
+        enemies.insert(i, x, 0.0)
+    assert sorted(aoe_targets(enemies, 'Whirlwind', 0, 0)) == [0, 1]
+    assert sorted(aoe_targets(enemies, 'Frost Nova', 0, 0)) == [0, 1, 2, 3]
+    assert aoe_targets(enemies, 'Bash', 0, 0) == []
+    ground = SpatialHash()
+    ground.insert('ring', PICKUP_RADIUS, 0)
+    ground.insert('axe', PICKUP_RADIUS + 0.1, 0)
+    assert pick_up(ground, 0, 0) == ['ring']
+    assert 'ring' not in ground and 'axe' in ground
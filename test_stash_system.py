@@ -0,0 +1,58 @@
+import pickle
+import random
+
+import stash_system
+from item_model import Item
+from stash_system import Stash
+
+SIZES = [(1, 1), (1, 2), (2, 2), (1, 3), (2, 3), (1, 4)]
+
+
+def _bank(n, seed=4):
+    rng = random.Random(seed)
+    return {'slots': n, 'items': [{'name': f"Item {i}", 'type': 'Armor', 'rarity': 'Rare',
+                                   'stats': {'Armor': i}, 'size': rng.choice(SIZES)} for i in range(n)]}
+
+
+def _contents(stash):
+    # Per tab: sorted (name, rolls, placement) of every item
+    tabs = []
+    for index in range(len(stash.tabs)):
+        inventory = stash.open_tab(index)
+        tabs.append(sorted((item.name, item.rolls, inventory.locate(item)) for item in inventory.items))
+    return tabs
+
+
+def test_from_legacy_fills_tabs_in_order_without_reopening(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # DebugLog writes debug.log in the working directory
+    decoded = []
+    decode_tab = stash_system.decode_tab
+    monkeypatch.setattr(stash_system, 'decode_tab', lambda blob: decoded.append(blob) or decode_tab(blob))
+    bank = _bank(600)
+    bank['items'].append({'name': 'Banner', 'size': (11, 1)})  # wider than a tab: dropped
+    stash = Stash.from_legacy(bank)
+    assert decoded == []
+    assert not any(stash.is_open(i) for i in range(len(stash.tabs)))
+    assert stash.item_count() == 600
+    # Each tab holds the next contiguous run of the legacy list
+    runs = [[int(name.split()[1]) for name, _, _ in tab] for tab in _contents(stash)]
+    assert sorted(i for run in runs for i in run) == list(range(600))
+    runs = [sorted(run) for run in runs if run]
+    assert all(run == list(range(run[0], run[-1] + 1)) for run in runs)
+    assert [run[0] for run in runs] == sorted(run[0] for run in runs)
+
+
+def test_lru_eviction_and_pickling_round_trip_every_tab():
+    stash = Stash(tabs=5, max_open=2)
+    rng = random.Random(9)
+    for i in range(300):
+        item = Item(f"Gem {i}", "Misc", "Rare", {"Power": rng.randint(1, 99)}, rng.choice(SIZES))
+        stash.deposit(item, rng.randrange(len(stash.tabs)))
+    expected = _contents(stash)
+    assert sum(stash.is_open(i) for i in range(len(stash.tabs))) == 2
+    # Evicted tabs decode to the same layout, and a pickle carries open tabs too
+    assert _contents(stash) == expected
+    restored = pickle.loads(pickle.dumps(stash))
+    assert not any(restored.is_open(i) for i in range(len(restored.tabs)))
+    assert restored.item_count() == stash.item_count()
+    assert _contents(restored) == expected